@@ -4,13 +4,28 @@ Simple Shoprite API - No Database, JSON Only
 FastAPI wrapper for Shoprite scraper with direct JSON responses
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 import asyncio
+import gzip
+import hashlib
+import json
 import os
-from shoprite_scraper import ShopriteScraper
-from pnp_scraper import PnPScraper
+import time
+from categories import SHOPRITE_CATEGORIES, PNP_CATEGORIES, STORE_CATEGORIES, get_category_url
+from scrape_cache import ScrapeCache
+from product_record import json_default, parse_fields, project_product
+from scrape_context import ScrapeContext
+from snapshot_store import SnapshotStore
+from selector_cache import selector_cache
+
+# Scraper modules are imported on first use in scrape_category_page: they pull
+# in requests, BeautifulSoup and (for Pick n Pay) Selenium, which would
+# otherwise dominate cold start on Render.
 
 app = FastAPI(
     title="Simple Grocery API",
@@ -27,8 +42,482 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Cache and startup warm-up settings
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 3600))
+ACCESS_COUNTS_FILE = os.getenv("ACCESS_COUNTS_FILE", "access_counts.json")
+# Most listing pages (with their rendered bodies) kept in memory
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 200))
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_STORES = [store.strip() for store in os.getenv("WARMUP_STORES", "shoprite,picknpay").split(",") if store.strip()]
+WARMUP_MAX_CATEGORIES = int(os.getenv("WARMUP_MAX_CATEGORIES", 4))
+WARMUP_TIMEOUT_SECONDS = int(os.getenv("WARMUP_TIMEOUT_SECONDS", 300))
+# Warm-up passes over categories that failed or came back empty, and the pause between them
+WARMUP_ATTEMPTS = int(os.getenv("WARMUP_ATTEMPTS", 3))
+WARMUP_RETRY_SECONDS = int(os.getenv("WARMUP_RETRY_SECONDS", 60))
+
+# Last-good snapshots served when a live scrape fails
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", 7 * 24 * 3600))
+
+# Concurrent scrapes allowed per store, as "store:limit,..." (Pick n Pay runs Selenium)
+STORE_CONCURRENCY = os.getenv("STORE_CONCURRENCY", "shoprite:3,picknpay:1,woolworths:2")
+DEFAULT_STORE_CONCURRENCY = 2
+
+# Request time budget (timeout_ms): server default and the most a client may ask for
+REQUEST_TIMEOUT_MS = int(os.getenv("REQUEST_TIMEOUT_MS", 25000))
+MAX_REQUEST_TIMEOUT_MS = int(os.getenv("MAX_REQUEST_TIMEOUT_MS", 120000))
+# Extra time a scraper gets after its deadline to hand back what it has gathered
+DEADLINE_GRACE_SECONDS = 0.5
+# How often a waiting request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", 0.5))
+
+# Rendered response bodies kept per cache entry, and the smallest body worth gzipping
+RENDERED_VARIANTS_PER_ENTRY = 8
+GZIP_MIN_BYTES = 1024
+
+# Batch endpoint settings
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 10))
+BATCH_TIMEOUT_SECONDS = float(os.getenv("BATCH_TIMEOUT_SECONDS", 120))
+
+# Categories served by this API, in default warm-up priority order
+CATEGORY_REGISTRY = {
+    "shoprite": list(SHOPRITE_CATEGORIES.keys()),
+    "picknpay": list(PNP_CATEGORIES.keys())
+}
+
+scrape_cache = ScrapeCache(ttl_seconds=CACHE_TTL_SECONDS, access_counts_file=ACCESS_COUNTS_FILE,
+                           max_entries=CACHE_MAX_ENTRIES)
+snapshot_store = SnapshotStore(SNAPSHOT_DIR, max_age_seconds=SNAPSHOT_MAX_AGE_SECONDS)
+
+warmup_status = {
+    "state": "pending",
+    "targets": [],
+    "warmed": [],
+    "failed": [],
+    "started_at": None,
+    "finished_at": None
+}
+warmup_task = None
+
+def parse_store_limits(value: str) -> Dict[str, int]:
+    """Parse "store:limit,..." into per-store concurrency limits"""
+    limits = {store: DEFAULT_STORE_CONCURRENCY for store in STORE_CATEGORIES}
+    for item in value.split(","):
+        store, _, limit = item.partition(":")
+        if store.strip() and limit.strip():
+            limits[store.strip()] = max(1, int(limit))
+    return limits
+
+store_limits = parse_store_limits(STORE_CONCURRENCY)
+store_semaphores = {store: asyncio.Semaphore(limit) for store, limit in store_limits.items()}
+
+class BatchItem(BaseModel):
+    store: str
+    category: str
+    page: int = Field(0, ge=0)
+    max_products: Optional[int] = Field(None, ge=1)
+    fields: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+    timeout_seconds: Optional[float] = Field(None, gt=0)
+
+def scrape_category_page(store: str, category: str, page: int, max_products: Optional[int] = None,
+                         fields: Optional[Tuple[str, ...]] = None,
+                         context: Optional[ScrapeContext] = None) -> Tuple[List[Dict], str, bool]:
+    """Scrape one listing page for a registered category (blocking, run in a worker thread)
+    
+    With max_products set the scraper stops extracting once that many products are found.
+    With fields set the scraper skips extracting any other product fields.
+    With a context deadline the scraper returns early; the third value reports a partial page.
+    """
+    context = context or ScrapeContext()
+    url = get_category_url(store, category, page)
+    
+    if store == "shoprite":
+        from shoprite_scraper import ShopriteScraper
+        
+        products = ShopriteScraper().scrape(url=url, max_pages=1, max_products=max_products, fields=fields,
+                                          context=context)
+    elif store == "picknpay":
+        from pnp_scraper import PnPScraper
+        
+        products = PnPScraper().scrape(url=url, max_pages=1, max_products=max_products, fields=fields,
+                                          context=context)
+    elif store == "woolworths":
+        from woolworths_scraper import WoolworthsScraper
+        
+        products = WoolworthsScraper(category).scrape_category(
+            max_pages=1, max_products=max_products, fields=fields, start_page=page, context=context
+        )
+    else:
+        raise ValueError(f"Unknown store '{store}'")
+    
+    return products, url, context.partial
+
+async def scrape_with_store_limit(store: str, category: str, page: int, max_products: Optional[int] = None,
+                                  fields: Optional[Tuple[str, ...]] = None,
+                                  context: Optional[ScrapeContext] = None) -> Tuple[List[Dict], str, bool]:
+    """Scrape a category page in a worker thread once the store has a free scrape slot
+    
+    Complete, unprojected and uncapped results are saved as the page's
+    last-good snapshot, so a snapshot can answer any request. An empty
+    result for a page that had products before is treated as a failed scrape;
+    otherwise it comes back partial, so it is neither cached nor saved.
+    """
+    async with store_semaphores[store]:
+        if context and context.should_stop():
+            # Cancelled or out of time while queued - don't start a browser for nobody
+            return [], get_category_url(store, category, page), True
+        products, url, partial = await asyncio.to_thread(
+            scrape_category_page, store, category, page, max_products, fields, context
+        )
+    
+    if not partial:
+        key = (store, category, page)
+        if products:
+            if max_products is None and fields is None:
+                await asyncio.to_thread(snapshot_store.save, key, products, url, None, None, CACHE_TTL_SECONDS)
+        else:
+            snapshot = await asyncio.to_thread(snapshot_store.load, key)
+            if snapshot and snapshot['products']:
+                raise RuntimeError(f"No products found on {url}")
+    
+    # Nothing found is almost always a failed fetch, never a complete page
+    return products, url, partial or not products
+
+async def cancel_on_disconnect(request: Request, awaitable):
+    """Await awaitable, cancelling it if the client disconnects first
+    
+    Raises HTTPException 499 (client closed request) after a disconnect.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                print(f"🔌 Client disconnected, cancelling {request.url.path}")
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        task.cancel()
+
+async def get_category_products(store: str, category: str, page: int, max_products: Optional[int] = None,
+                                fields: Optional[Tuple[str, ...]] = None, count_access: bool = True,
+                                timeout_ms: Optional[int] = None, request: Optional[Request] = None) -> Dict:
+    """Get a category page from the cache, scraping it on a miss
+    
+    With timeout_ms set the scrape stops at the deadline and the entry comes
+    back with partial=True. A request that joined another request's scrape
+    and runs out of time first gets an empty partial entry.
+    
+    With request set, a client disconnect cancels the wait, and the scrape
+    itself stops at its next check unless other requests are waiting on it.
+    """
+    if count_access:
+        scrape_cache.record_access(store, category)
+    
+    context = ScrapeContext(timeout_ms)
+    
+    def fetch():
+        return scrape_cache.get_or_fill(
+            (store, category, page),
+            lambda: scrape_with_store_limit(store, category, page, max_products, fields, context),
+            max_products,
+            fields,
+            on_abandoned=context.cancel
+        )
+    
+    try:
+        if request is not None:
+            return await cancel_on_disconnect(request, wait_for_entry(store, category, page, max_products, fields,
+                                                                      context, fetch))
+        return await wait_for_entry(store, category, page, max_products, fields, context, fetch)
+    except HTTPException:
+        raise
+    except Exception as e:
+        snapshot = await asyncio.to_thread(snapshot_store.load, (store, category, page))
+        snapshot_fields = tuple(snapshot['fields']) if snapshot and snapshot['fields'] else None
+        # A snapshot with fewer products or fields than asked for is not a substitute
+        if not snapshot or not ScrapeCache.covers(snapshot['max_products'], max_products, snapshot_fields, fields):
+            raise
+        
+        print(f"⚠️  Live scrape of {store}/{category} page {page} failed ({e}), serving last good snapshot")
+        return {
+            'products': snapshot['products'],
+            'url': snapshot['url'],
+            'max_products': snapshot['max_products'],
+            'fields': snapshot_fields,
+            'partial': False,
+            'stale': True,
+            'snapshot_age_seconds': int(time.time() - snapshot['scraped_at']),
+            'cached_at': snapshot['scraped_at']
+        }
+
+async def wait_for_entry(store: str, category: str, page: int, max_products: Optional[int],
+                         fields: Optional[Tuple[str, ...]], context: ScrapeContext, fetch) -> Dict:
+    """Wait for fetch() within the context deadline (see get_category_products)"""
+    if context.deadline is None:
+        return await fetch()
+    
+    try:
+        entry = await asyncio.wait_for(fetch(), timeout=context.remaining() + DEADLINE_GRACE_SECONDS)
+        # A joined scrape cut short by a tighter deadline than ours: scrape again with our own budget
+        if entry['partial'] and not context.partial and context.remaining() > 0:
+            entry = await asyncio.wait_for(fetch(), timeout=context.remaining() + DEADLINE_GRACE_SECONDS)
+        return entry
+    except asyncio.TimeoutError:
+        return {
+            'products': [],
+            'url': get_category_url(store, category, page),
+            'max_products': max_products,
+            'fields': fields,
+            'partial': True,
+            'cached_at': time.time()
+        }
+
+def limit_products(products: List[Dict], max_products: Optional[int]) -> List[Dict]:
+    """Apply the optional max_products limit"""
+    if max_products and len(products) > max_products:
+        return products[:max_products]
+    return products
+
+def freshness(entry: Dict) -> Dict:
+    """Response flags telling clients whether the products are complete and current"""
+    flags = {"partial": entry['partial'], "stale": entry.get('stale', False)}
+    if flags["stale"]:
+        flags["snapshot_age_seconds"] = entry['snapshot_age_seconds']
+    return flags
+
+def scrape_message(entry: Dict, products_label: str, page: int) -> str:
+    """Response message, saying so when the products come from a stale snapshot"""
+    if entry.get('stale'):
+        return f"Live scrape failed, serving {products_label} from page {page} from a stale snapshot"
+    return f"Successfully scraped {products_label} from page {page}"
+
+def entry_etag(request: Request, entry: Dict, max_products: Optional[int],
+               fields: Optional[Tuple[str, ...]]) -> str:
+    """Strong ETag for the response built from a cache entry
+    
+    The product set is hashed once per cache entry; the ETag combines that
+    digest with everything else the response body depends on.
+    """
+    digest = entry.get('digest')
+    if digest is None:
+        digest = hashlib.sha256(json.dumps(entry['products'], sort_keys=True, default=json_default).encode()).hexdigest()
+        entry['digest'] = digest
+    
+    variant = json.dumps([request.url.path, max_products, fields, entry['url'], freshness(entry)], default=str)
+    return '"' + hashlib.sha256(f"{digest}|{variant}".encode()).hexdigest()[:32] + '"'
+
+def cache_control(entry: Dict) -> str:
+    """Cache-Control matching how long the entry stays in the scrape cache"""
+    if entry['partial'] or entry.get('stale'):
+        return "no-cache"
+    max_age = max(0, int(CACHE_TTL_SECONDS - (time.time() - entry['cached_at'])))
+    return f"public, max-age={max_age}"
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the If-None-Match header against etag (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def accepts_gzip(request: Request) -> bool:
+    """Check whether the Accept-Encoding header allows gzip"""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def render_body(body: Dict) -> Tuple[bytes, Optional[bytes]]:
+    """Serialize a response body once, as JSON bytes plus a gzip copy for larger bodies"""
+    # Same encoding as FastAPI's JSONResponse
+    content = json.dumps(body, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+                         default=json_default).encode("utf-8")
+    compressed = gzip.compress(content, compresslevel=6) if len(content) >= GZIP_MIN_BYTES else None
+    return content, compressed
+
+def conditional_response(request: Optional[Request], entry: Dict, max_products: Optional[int],
+                         fields: Optional[Tuple[str, ...]], build_body) -> Response:
+    """Answer with 304 Not Modified if the client has this version, otherwise with the JSON body
+    
+    Rendered bodies (JSON and gzip bytes) are kept on the cache entry per
+    ETag, so repeated hits skip encoding, serialization and compression.
+    
+    Args:
+        build_body: Called with the limited, projected products; returns the response dict
+    """
+    headers = {"Cache-Control": cache_control(entry)}
+    if request is None:
+        products = [project_product(product, fields) for product in limit_products(entry['products'], max_products)]
+        return Response(content=render_body(build_body(products))[0], media_type="application/json", headers=headers)
+    
+    headers["Vary"] = "Accept-Encoding"
+    etag = entry_etag(request, entry, max_products, fields)
+    # Each content coding is its own representation, so gzip gets its own strong ETag
+    gzip_etag = etag[:-1] + '-gzip"'
+    for candidate in (etag, gzip_etag):
+        if etag_matches(request, candidate):
+            headers["ETag"] = candidate
+            return Response(status_code=304, headers=headers)
+    
+    rendered = entry.setdefault('rendered', {})
+    if etag not in rendered:
+        products = [project_product(product, fields) for product in limit_products(entry['products'], max_products)]
+        if len(rendered) >= RENDERED_VARIANTS_PER_ENTRY:
+            del rendered[next(iter(rendered))]
+        rendered[etag] = render_body(build_body(products))
+    content, compressed = rendered[etag]
+    
+    if compressed is not None and accepts_gzip(request):
+        headers["ETag"] = gzip_etag
+        headers["Content-Encoding"] = "gzip"
+        content = compressed
+    else:
+        headers["ETag"] = etag
+    
+    return Response(content=content, media_type="application/json", headers=headers)
+
+def request_timeout_ms(timeout_ms: Optional[int]) -> int:
+    """Apply the server default and cap to the timeout_ms parameter"""
+    return min(timeout_ms or REQUEST_TIMEOUT_MS, MAX_REQUEST_TIMEOUT_MS)
+
+def requested_fields(fields: Optional[str], store: str) -> Optional[Tuple[str, ...]]:
+    """Parse the fields query parameter, rejecting unknown fields with a 400"""
+    try:
+        return parse_fields(fields, store)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def shoprite_category_response(category: str, page: int, max_products: Optional[int],
+                                     fields: Optional[str] = None, timeout_ms: Optional[int] = None,
+                                     request: Optional[Request] = None) -> Response:
+    """Build the response for a Shoprite category endpoint"""
+    category_name = SHOPRITE_CATEGORIES[category]['name']
+    selected_fields = requested_fields(fields, "shoprite")
+    
+    try:
+        entry = await get_category_products("shoprite", category, page, max_products, selected_fields,
+                                            timeout_ms=request_timeout_ms(timeout_ms), request=request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        if category == "all-products":
+            raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"{category_name} scraping failed: {str(e)}")
+    
+    label = "" if category == "all-products" else f"{category_name} "
+    
+    return conditional_response(request, entry, max_products, selected_fields, lambda products: {
+        "message": scrape_message(entry, f"{len(products)} {label}products", page),
+        "page": page,
+        "products_count": len(products),
+        "category": category_name,
+        "products": products,
+        "url": entry['url'],
+        **freshness(entry)
+    })
+
+async def run_batch_item(item: BatchItem, timeout_ms: int) -> Dict:
+    """Fetch one batch item, reporting failures in the result instead of raising"""
+    started = time.perf_counter()
+    result = {"store": item.store, "category": item.category, "page": item.page}
+    
+    try:
+        get_category_url(item.store, item.category, item.page)
+        selected_fields = parse_fields(item.fields, item.store)
+    except ValueError as e:
+        result.update({"status": "invalid", "error": str(e), "elapsed_ms": 0.0})
+        return result
+    
+    try:
+        entry = await get_category_products(item.store, item.category, item.page, item.max_products,
+                                            selected_fields, timeout_ms=timeout_ms)
+        products = [project_product(product, selected_fields)
+                    for product in limit_products(entry['products'], item.max_products)]
+        result.update({
+            "status": "ok",
+            "products_count": len(products),
+            "products": products,
+            "url": entry['url'],
+            **freshness(entry)
+        })
+    except Exception as e:
+        result.update({"status": "error", "error": f"Scraping failed: {str(e)}"})
+    
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+async def warm_up_cache():
+    """Pre-scrape the most requested categories so the first requests after a deploy hit the cache"""
+    registry = {store: categories for store, categories in CATEGORY_REGISTRY.items() if store in WARMUP_STORES}
+    targets = scrape_cache.hot_categories(registry, WARMUP_MAX_CATEGORIES)
+    
+    warmup_status["state"] = "running"
+    warmup_status["targets"] = [f"{store}/{category}" for store, category in targets]
+    warmup_status["started_at"] = datetime.now().isoformat()
+    print(f"🔥 Warming up {len(targets)} categories: {', '.join(warmup_status['targets'])}")
+    
+    async def warm_targets():
+        pending = list(targets)
+        for attempt in range(WARMUP_ATTEMPTS):
+            if attempt:
+                # Give a flaky upstream time to recover before trying the failures again
+                await asyncio.sleep(WARMUP_RETRY_SECONDS)
+            
+            failed = []
+            # One category at a time - warm-up must not starve live requests
+            for store, category in pending:
+                try:
+                    entry = await get_category_products(store, category, 0, count_access=False)
+                    if entry['partial']:
+                        raise RuntimeError("no products found (not cached)")
+                    warmup_status["warmed"].append(f"{store}/{category}")
+                except Exception as e:
+                    print(f"⚠️  Warm-up failed for {store}/{category} (attempt {attempt + 1}): {e}")
+                    failed.append((store, category))
+            
+            pending = failed
+            warmup_status["failed"] = [f"{store}/{category}" for store, category in pending]
+            if not pending:
+                break
+    
+    try:
+        await asyncio.wait_for(warm_targets(), timeout=WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        print(f"⚠️  Warm-up timed out after {WARMUP_TIMEOUT_SECONDS}s")
+    finally:
+        warmup_status["state"] = "ready"
+        warmup_status["finished_at"] = datetime.now().isoformat()
+        print(f"✅ Warm-up finished: {len(warmup_status['warmed'])} warmed, {len(warmup_status['failed'])} failed")
+
+@app.on_event("startup")
+async def startup_event():
+    """Load access counts and start the cache warm-up in the background"""
+    global warmup_task
+    
+    scrape_cache.load_access_counts()
+    
+    if WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(warm_up_cache())
+    else:
+        warmup_status["state"] = "disabled"
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist access counts for the next warm-up and the selector hit counts"""
+    scrape_cache.save_access_counts()
+    selector_cache.save()
+
 @app.get("/", 
          summary="API Information",
          description="Get information about the Simple Grocery API",
@@ -61,430 +550,227 @@ async def root():
         },
         "parameters": {
             "page": "Page number (0-indexed, default: 0)",
-            "max_products": "Maximum number of products (optional)"
-        }
+            "max_products": "Maximum number of products (optional)",
+            "timeout_ms": f"Time budget in milliseconds, partial results are returned when it runs out (optional, default: {REQUEST_TIMEOUT_MS})",
+            "fields": "Comma-separated product fields to return (optional, default: all)"
+        },
+        "batch": "POST /api/batch",
+        "readiness": "/ready",
+        "selectors": "/api/selectors"
     }
 
+@app.get("/ready",
+         summary="Readiness Check",
+         description="Reports ready once the startup cache warm-up has finished",
+         tags=["Info"])
+async def ready():
+    if warmup_status["state"] in ("ready", "disabled"):
+        return {"ready": True, "warmup": warmup_status}
+    raise HTTPException(status_code=503, detail={"ready": False, "warmup": warmup_status})
+
+@app.get("/api/selectors",
+         summary="Learned Container Selectors",
+         description="Product container selector learned for each store page template, with hit, miss and discovery counts",
+         tags=["Info"])
+async def get_selectors():
+    return {"selectors": selector_cache.report()}
+
 # All Shoprite Endpoints
 @app.get("/api/shoprite/all-products",
          summary="Get All Shoprite Products",
          description="Get all products from Shoprite with pagination support",
          tags=["Shoprite"])
 async def get_shoprite_all_products(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get all products from Shoprite"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "All Products",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+    return await shoprite_category_response("all-products", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/food-cupboard",
          summary="Get Shoprite Food Cupboard Products",
          description="Get products from Shoprite Food Cupboard category",
          tags=["Shoprite"])
 async def get_shoprite_food_cupboard(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Food Cupboard category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afood_cupboard%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afood_cupboard%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Food Cupboard products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Food Cupboard",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Food Cupboard scraping failed: {str(e)}")
+    return await shoprite_category_response("food-cupboard", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/fresh-meat-poultry",
          summary="Get Shoprite Fresh Meat & Poultry Products",
          description="Get products from Shoprite Fresh Meat & Poultry category",
          tags=["Shoprite"])
 async def get_shoprite_fresh_meat_poultry(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Fresh Meat & Poultry category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Fresh Meat & Poultry products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Fresh Meat & Poultry",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fresh Meat & Poultry scraping failed: {str(e)}")
+    return await shoprite_category_response("fresh-meat-poultry", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/frozen-meat-poultry",
          summary="Get Shoprite Frozen Meat & Poultry Products",
          description="Get products from Shoprite Frozen Meat & Poultry category",
          tags=["Shoprite"])
 async def get_shoprite_frozen_meat_poultry(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Frozen Meat & Poultry category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Frozen Meat & Poultry products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Frozen Meat & Poultry",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Frozen Meat & Poultry scraping failed: {str(e)}")
+    return await shoprite_category_response("frozen-meat-poultry", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/milk-butter-eggs",
          summary="Get Shoprite Milk, Butter & Eggs Products",
          description="Get products from Shoprite Milk, Butter & Eggs category",
          tags=["Shoprite"])
 async def get_shoprite_milk_butter_eggs(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Milk, Butter & Eggs category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Amilk_butter_and_eggs%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Amilk_butter_and_eggs%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Milk, Butter & Eggs products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Milk, Butter & Eggs",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Milk, Butter & Eggs scraping failed: {str(e)}")
+    return await shoprite_category_response("milk-butter-eggs", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/cheese",
          summary="Get Shoprite Cheese Products",
          description="Get products from Shoprite Cheese category",
          tags=["Shoprite"])
 async def get_shoprite_cheese(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Cheese category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Acheese%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Acheese%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Cheese products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Cheese",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Cheese scraping failed: {str(e)}")
+    return await shoprite_category_response("cheese", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/yoghurt",
          summary="Get Shoprite Yoghurt Products",
          description="Get products from Shoprite Yoghurt category",
          tags=["Shoprite"])
 async def get_shoprite_yoghurt(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Yoghurt category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Ayoghurt%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Ayoghurt%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Yoghurt products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Yoghurt",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Yoghurt scraping failed: {str(e)}")
+    return await shoprite_category_response("yoghurt", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/fresh-fruit",
          summary="Get Shoprite Fresh Fruit Products",
          description="Get products from Shoprite Fresh Fruit category",
          tags=["Shoprite"])
 async def get_shoprite_fresh_fruit(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Fresh Fruit category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_fruit%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_fruit%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Fresh Fruit products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Fresh Fruit",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fresh Fruit scraping failed: {str(e)}")
+    return await shoprite_category_response("fresh-fruit", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/fresh-vegetables",
          summary="Get Shoprite Fresh Vegetables Products",
          description="Get products from Shoprite Fresh Vegetables category",
          tags=["Shoprite"])
 async def get_shoprite_fresh_vegetables(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Fresh Vegetables category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_vegetables%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_vegetables%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Fresh Vegetables products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Fresh Vegetables",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fresh Vegetables scraping failed: {str(e)}")
+    return await shoprite_category_response("fresh-vegetables", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/fresh-salad-herbs-dip",
          summary="Get Shoprite Fresh Salad, Herbs & Dip Products",
          description="Get products from Shoprite Fresh Salad, Herbs & Dip category",
          tags=["Shoprite"])
 async def get_shoprite_fresh_salad_herbs_dip(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Fresh Salad, Herbs & Dip category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_salad_herbs_and_dip%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_salad_herbs_and_dip%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Fresh Salad, Herbs & Dip products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Fresh Salad, Herbs & Dip",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fresh Salad, Herbs & Dip scraping failed: {str(e)}")
+    return await shoprite_category_response("fresh-salad-herbs-dip", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/bakery",
          summary="Get Shoprite Bakery Products",
          description="Get products from Shoprite Bakery category",
          tags=["Shoprite"])
 async def get_shoprite_bakery(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Bakery category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Abakery%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Abakery%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Bakery products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Bakery",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Bakery scraping failed: {str(e)}")
+    return await shoprite_category_response("bakery", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/frozen-food",
          summary="Get Shoprite Frozen Food Products",
          description="Get products from Shoprite Frozen Food category",
          tags=["Shoprite"])
 async def get_shoprite_frozen_food(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Frozen Food category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_food%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_food%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Frozen Food products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Frozen Food",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Frozen Food scraping failed: {str(e)}")
+    return await shoprite_category_response("frozen-food", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/chocolates-sweets",
          summary="Get Shoprite Chocolates & Sweets Products",
          description="Get products from Shoprite Chocolates & Sweets category",
          tags=["Shoprite"])
 async def get_shoprite_chocolates_sweets(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Chocolates & Sweets category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Achocolates_and_sweets%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Achocolates_and_sweets%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Chocolates & Sweets products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Chocolates & Sweets",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chocolates & Sweets scraping failed: {str(e)}")
+    return await shoprite_category_response("chocolates-sweets", page, max_products, fields, timeout_ms, request)
 
 @app.get("/api/shoprite/ready-meals",
          summary="Get Shoprite Ready Meals Products",
          description="Get products from Shoprite Ready Meals category",
          tags=["Shoprite"])
 async def get_shoprite_ready_meals(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get products from Shoprite Ready Meals category"""
-    try:
-        scraper = ShopriteScraper()
-        
-        if page == 0:
-            url = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Aready_meals%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0"
-        else:
-            url = f"https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Aready_meals%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
-        
-        products = scraper.scrape(url=url, max_pages=1, max_products=max_products)
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Ready Meals products from page {page}",
-            "page": page,
-            "products_count": len(products),
-            "category": "Ready Meals",
-            "products": products,
-            "url": url
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ready Meals scraping failed: {str(e)}")
+    return await shoprite_category_response("ready-meals", page, max_products, fields, timeout_ms, request)
 
 # Pick n Pay Endpoints
 @app.get("/api/picknpay/all-products",
@@ -492,29 +778,30 @@ async def get_shoprite_ready_meals(
          description="Get all products from Pick n Pay with pagination support",
          tags=["Pick n Pay"])
 async def get_picknpay_all_products(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get all products from Pick n Pay"""
+    selected_fields = requested_fields(fields, "picknpay")
+    
     try:
-        scraper = PnPScraper()
-        
-        # Use the scraper with the correct URL
-        url = "https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase"
-        products = scraper.scrape(max_pages=1, url=url)
+        entry = await get_category_products("picknpay", "all-products", page, max_products, selected_fields,
+                                            timeout_ms=request_timeout_ms(timeout_ms), request=request)
         
-        # Limit products if max_products is specified
-        if max_products and len(products) > max_products:
-            products = products[:max_products]
-        
-        return {
-            "message": f"Successfully scraped {len(products)} Pick n Pay products from page {page}",
+        return conditional_response(request, entry, max_products, selected_fields, lambda products: {
+            "message": scrape_message(entry, f"{len(products)} Pick n Pay products", page),
             "page": page,
             "products_count": len(products),
             "category": "All Products",
             "products": products,
-            "url": "https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase"
-        }
+            "url": entry['url'],
+            **freshness(entry)
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pick n Pay scraping failed: {str(e)}")
 
@@ -523,31 +810,84 @@ async def get_picknpay_all_products(
          description="Get promotional products from Pick n Pay",
          tags=["Pick n Pay"])
 async def get_picknpay_promotions(
+    request: Request,
     page: int = Query(0, description="Page number (0-indexed, default: 0)", ge=0),
-    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)")
+    max_products: Optional[int] = Query(None, description="Maximum number of products to return (optional)", ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all)"),
+    timeout_ms: Optional[int] = Query(None, description="Time budget in milliseconds; partial results are returned when it runs out (optional)", ge=1)
 ):
     """Get promotional products from Pick n Pay"""
+    selected_fields = requested_fields(fields, "picknpay")
+    
     try:
-        scraper = PnPScraper()
-        
-        # Use the promotions scraper (this is what it's designed for)
-        products = scraper.scrape(max_pages=1)
-        
-        # Limit products if max_products is specified
-        if max_products and len(products) > max_products:
-            products = products[:max_products]
+        entry = await get_category_products("picknpay", "promotions", page, max_products, selected_fields,
+                                            timeout_ms=request_timeout_ms(timeout_ms), request=request)
         
-        return {
-            "message": f"Successfully scraped {len(products)} Pick n Pay promotional products from page {page}",
+        return conditional_response(request, entry, max_products, selected_fields, lambda products: {
+            "message": scrape_message(entry, f"{len(products)} Pick n Pay promotional products", page),
             "page": page,
             "products_count": len(products),
             "category": "Promotions",
             "products": products,
-            "url": "https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase:isOnPromotion:On%20Promotion"
-        }
+            "url": entry['url'],
+            **freshness(entry)
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pick n Pay promotions scraping failed: {str(e)}")
 
+# Batch Endpoint
+@app.post("/api/batch",
+          summary="Batch Scrape",
+          description="Fetch several store/category pages in one request. Items run concurrently within the per-store scrape limits; each result has its own status and timing, and items still running at the deadline are reported as timed out.",
+          tags=["Batch"])
+async def batch_scrape(batch: BatchRequest, request: Request):
+    """Fetch several category pages concurrently"""
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="No requests given")
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many requests ({len(batch.requests)}). Maximum: {BATCH_MAX_ITEMS}")
+    
+    timeout = min(batch.timeout_seconds or BATCH_TIMEOUT_SECONDS, BATCH_TIMEOUT_SECONDS)
+    started = time.perf_counter()
+    
+    tasks = [asyncio.create_task(run_batch_item(item, int(timeout * 1000))) for item in batch.requests]
+    try:
+        done, pending = await cancel_on_disconnect(
+            request, asyncio.wait(tasks, timeout=timeout + DEADLINE_GRACE_SECONDS)
+        )
+    finally:
+        # Cancelled items stop their scrapes unless another request shares them
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    
+    results = []
+    for item, task in zip(batch.requests, tasks):
+        if task in done:
+            results.append(task.result())
+        else:
+            results.append({
+                "store": item.store,
+                "category": item.category,
+                "page": item.page,
+                "status": "timeout",
+                "error": f"Not finished within {timeout}s",
+                "elapsed_ms": round(timeout * 1000, 1)
+            })
+    
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    
+    return {
+        "message": f"Completed {succeeded} of {len(results)} batch requests",
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "partial": any(result["status"] != "ok" or result["partial"] for result in results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "results": results
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
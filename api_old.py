@@ -8,7 +8,7 @@ Deploy to Render with PostgreSQL database
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import asyncio
 import os
 from datetime import datetime, timedelta
@@ -23,6 +23,9 @@ import hashlib
 from pnp_scraper import PnPScraper
 from shoprite_scraper import ShopriteScraper  
 from woolworths_scraper import WoolworthsScraper
+from money import parse_cents
+from product_identity import identity_candidates
+from pagination import MAX_PAGE_SIZE, decode_cursor, next_cursor, page_size
 
 app = FastAPI(
     title="South African Grocery Scraper API",
@@ -61,6 +64,124 @@ def get_db_connection():
         print(f"Database connection error: {e}")
         return None
 
+# Indexes matching the API's read paths, created on startup if missing
+DATABASE_INDEXES = {
+    # /api/products: filtered by store (and category), paged newest first over (scraped_at, id)
+    'idx_products_store_category_scraped_id': "products (store, category, scraped_at DESC, id DESC)",
+    'idx_products_store_scraped_id': "products (store, scraped_at DESC, id DESC)",
+    'idx_products_scraped_id': "products (scraped_at DESC, id DESC)",
+    # /api/price-changes (paged over (changed_at, id)) and the exact 24h count in /api/stats
+    'idx_price_history_changed_id': "price_history (changed_at DESC, id DESC)",
+    # Price history of one product (foreign key lookups, dedup merges)
+    'idx_price_history_product': "price_history (product_id, changed_at DESC)",
+    # ScrapeSession.claim and /api/scrape-status: latest scrapes per store and category
+    'idx_scraping_cache_store_category_scraped': "scraping_cache (store, category, scraped_at DESC)",
+    'idx_scraping_cache_scraped': "scraping_cache (scraped_at DESC)",
+}
+
+# Indexes superseded by the ones above, dropped on startup
+REPLACED_INDEXES = (
+    'idx_products_store_category_scraped',
+    'idx_products_store_scraped',
+    'idx_products_scraped',
+    'idx_price_history_changed',
+)
+
+def create_indexes(cursor):
+    """Create any missing indexes from DATABASE_INDEXES and drop replaced ones"""
+    for name in REPLACED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, definition in DATABASE_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+# Read path queries, built here so test_query_plans.py checks the SQL the endpoints run
+def products_query(store: Optional[str] = None, category: Optional[str] = None,
+                   after: Optional[Tuple[datetime, int]] = None, limit: int = 100) -> Tuple[str, List]:
+    """SQL and params for one /api/products page, newest first
+    
+    Args:
+        store: Filter by store (optional)
+        category: Filter by category (optional)
+        after: (scraped_at, id) key of the previous page's last row (optional)
+        limit: Page size; one extra row is fetched to tell whether another page follows
+    """
+    query = "SELECT * FROM products WHERE 1=1"
+    params = []
+    
+    if store:
+        query += " AND store = %s"
+        params.append(store)
+    
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    
+    if after:
+        # Keyset: continue strictly after the last row of the previous page
+        query += " AND (scraped_at, id) < (%s, %s)"
+        params.extend(after)
+    
+    query += " ORDER BY scraped_at DESC, id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+def price_changes_query(store: Optional[str] = None, category: Optional[str] = None,
+                        after: Optional[Tuple[datetime, int]] = None, limit: int = 50) -> Tuple[str, List]:
+    """SQL and params for one /api/price-changes page, newest first
+    
+    Args:
+        store: Only changes of this store's products (optional)
+        category: Only changes of products in this category (optional)
+        after: (changed_at, id) key of the previous page's last row (optional)
+        limit: Page size; one extra row is fetched to tell whether another page follows
+    """
+    query = """
+        SELECT ph.id, p.name, ph.old_price, ph.new_price, 
+               ((ph.new_price - ph.old_price) / ph.old_price * 100) as change_percent,
+               ph.changed_at
+        FROM price_history ph
+        JOIN products p ON ph.product_id = p.id
+        WHERE 1=1
+    """
+    params = []
+    
+    if store:
+        query += " AND p.store = %s"
+        params.append(store)
+    
+    if category:
+        query += " AND p.category = %s"
+        params.append(category)
+    
+    if after:
+        # Keyset: continue strictly after the last row of the previous page
+        query += " AND (ph.changed_at, ph.id) < (%s, %s)"
+        params.extend(after)
+    
+    query += " ORDER BY ph.changed_at DESC, ph.id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+def recent_changes_query(exact: bool = False) -> Tuple[str, List]:
+    """SQL and params for the 24h price change count in /api/stats
+    
+    Summed from the hourly counts (this hour and the 23 before it), or
+    counted from price_history with exact set.
+    """
+    if exact:
+        return """
+            SELECT COUNT(*) as recent_changes
+            FROM price_history 
+            WHERE changed_at > NOW() - INTERVAL '24 hours'
+        """, []
+    
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    return """
+        SELECT COALESCE(SUM(changes), 0)::bigint as recent_changes
+        FROM price_change_counts
+        WHERE hour > %s
+    """, [hour - timedelta(hours=24)]
+
 # Initialize database tables
 def init_database():
     """Initialize database tables"""
@@ -112,6 +233,34 @@ def init_database():
             )
         """)
         
+        # Running totals for /api/stats, kept up to date by the ingestion path
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_summary (
+                store VARCHAR(20) NOT NULL,
+                category VARCHAR(100) NOT NULL,
+                products_count BIGINT DEFAULT 0,
+                scrapes_count BIGINT DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (store, category)
+            )
+        """)
+        
+        # Price changes per hour, for the 24h count in /api/stats
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_change_counts (
+                hour TIMESTAMP PRIMARY KEY,
+                changes BIGINT DEFAULT 0
+            )
+        """)
+        
+        # Indexes for the endpoints' filters and sort orders
+        create_indexes(cursor)
+        
+        # Fill the summary from the existing data the first time
+        cursor.execute("SELECT 1 FROM stats_summary LIMIT 1")
+        if cursor.fetchone() is None:
+            rebuild_stats(cursor)
+        
         conn.commit()
         return True
     except Exception as e:
@@ -154,30 +303,6 @@ def get_current_hour_key():
     now = datetime.now()
     return now.strftime("%Y-%m-%d-%H")
 
-def should_scrape_now(store: str, category: str) -> bool:
-    """Check if we should scrape now (not scraped this hour yet)"""
-    conn = get_db_connection()
-    if not conn:
-        return True  # If no DB, always scrape
-    
-    cursor = conn.cursor()
-    try:
-        hour_key = get_current_hour_key()
-        cursor.execute("""
-            SELECT id FROM scraping_cache 
-            WHERE store = %s AND category = %s AND hour_key = %s
-        """, (store, category, hour_key))
-        
-        result = cursor.fetchone()
-        return result is None  # Scrape if not found
-        
-    except Exception as e:
-        print(f"Error checking scrape cache: {e}")
-        return True  # If error, scrape anyway
-    finally:
-        cursor.close()
-        conn.close()
-
 def create_products_hash(products: List[Dict]) -> str:
     """Create hash of products for change detection"""
     # Create a simple hash based on product names and prices
@@ -190,61 +315,214 @@ def create_products_hash(products: List[Dict]) -> str:
     combined = "|".join(product_data)
     return hashlib.md5(combined.encode()).hexdigest()
 
-def get_previous_products_hash(store: str, category: str) -> str:
-    """Get hash of products from previous scrape"""
-    conn = get_db_connection()
-    if not conn:
-        return ""
+def write_scraping_cache(cursor, store: str, category: str, hour_key: str, products: List[Dict],
+                         changes_count: int):
+    """Upsert the scraping_cache row for an hour and count it in the stats (caller commits)"""
+    # A claimed row has no hash yet; the scrape counts once it completes
+    cursor.execute("""
+        SELECT products_hash FROM scraping_cache
+        WHERE store = %s AND category = %s AND hour_key = %s
+        FOR UPDATE
+    """, (store, category, hour_key))
+    previous = cursor.fetchone()
+    completed_before = previous is not None and previous['products_hash'] is not None
     
-    cursor = conn.cursor()
-    try:
+    cursor.execute("""
+        INSERT INTO scraping_cache (store, category, hour_key, products_hash, products_count, changes_detected)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (store, category, hour_key) DO UPDATE SET
+            products_hash = EXCLUDED.products_hash,
+            products_count = EXCLUDED.products_count,
+            changes_detected = EXCLUDED.changes_detected,
+            scraped_at = CURRENT_TIMESTAMP
+    """, (store, category, hour_key, create_products_hash(products), len(products), changes_count))
+    
+    if not completed_before:
+        record_stats(cursor, store, category, new_scrapes=1)
+
+def record_stats(cursor, store: str, category: str, new_products: int = 0, new_scrapes: int = 0,
+                 price_changes: int = 0):
+    """Add ingested counts to the stats summary (in the caller's transaction)
+    
+    Args:
+        store: Store key
+        category: Category the products and scrape belong to
+        new_products: Products inserted
+        new_scrapes: Scrapes completed
+        price_changes: Price changes logged (counted in the current hour)
+    """
+    if new_products or new_scrapes:
         cursor.execute("""
-            SELECT products_hash FROM scraping_cache 
-            WHERE store = %s AND category = %s 
-            ORDER BY scraped_at DESC LIMIT 1
-        """, (store, category))
-        
-        result = cursor.fetchone()
-        return result[0] if result else ""
-        
-    except Exception as e:
-        print(f"Error getting previous hash: {e}")
-        return ""
-    finally:
-        cursor.close()
-        conn.close()
+            INSERT INTO stats_summary (store, category, products_count, scrapes_count)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (store, category) DO UPDATE SET
+                products_count = stats_summary.products_count + EXCLUDED.products_count,
+                scrapes_count = stats_summary.scrapes_count + EXCLUDED.scrapes_count,
+                updated_at = CURRENT_TIMESTAMP
+        """, (store, category, new_products, new_scrapes))
+    
+    if price_changes:
+        # Same clock as price_history.changed_at
+        hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        cursor.execute("""
+            INSERT INTO price_change_counts (hour, changes)
+            VALUES (%s, %s)
+            ON CONFLICT (hour) DO UPDATE SET changes = price_change_counts.changes + EXCLUDED.changes
+        """, (hour, price_changes))
+        # Only the last 24 hours are ever read
+        cursor.execute("DELETE FROM price_change_counts WHERE hour < %s", (hour - timedelta(hours=48),))
 
-def update_scraping_cache(store: str, category: str, products: List[Dict], changes_count: int):
-    """Update scraping cache with current scrape info"""
-    conn = get_db_connection()
-    if not conn:
-        return
+def rebuild_stats(cursor):
+    """Recount the stats summary from the base tables (in the caller's transaction)"""
+    # Ingestion waits while the totals are rebuilt, so no increment is lost or counted twice
+    cursor.execute("LOCK TABLE stats_summary, price_change_counts IN EXCLUSIVE MODE")
+    cursor.execute("DELETE FROM stats_summary")
+    cursor.execute("""
+        INSERT INTO stats_summary (store, category, products_count, scrapes_count)
+        SELECT store, category, SUM(products_count), SUM(scrapes_count)
+        FROM (
+            SELECT store, category, COUNT(*) AS products_count, 0 AS scrapes_count
+            FROM products GROUP BY store, category
+            UNION ALL
+            SELECT store, category, 0, COUNT(*)
+            FROM scraping_cache WHERE products_hash IS NOT NULL GROUP BY store, category
+        ) counts
+        GROUP BY store, category
+    """)
+    cursor.execute("DELETE FROM price_change_counts")
+    cursor.execute("""
+        INSERT INTO price_change_counts (hour, changes)
+        SELECT date_trunc('hour', changed_at), COUNT(*)
+        FROM price_history WHERE changed_at >= %s
+        GROUP BY 1
+    """, (datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=48),))
+
+def recount_scrapes(cursor, store: Optional[str] = None, category: Optional[str] = None):
+    """Recount scrapes in the stats summary after scraping_cache rows were deleted"""
+    query = """
+        UPDATE stats_summary s SET scrapes_count = (
+            SELECT COUNT(*) FROM scraping_cache c
+            WHERE c.store = s.store AND c.category = s.category AND c.products_hash IS NOT NULL
+        ), updated_at = CURRENT_TIMESTAMP
+        WHERE 1=1
+    """
+    params = []
+    if store:
+        query += " AND s.store = %s"
+        params.append(store)
+    if category:
+        query += " AND s.category = %s"
+        params.append(category)
+    cursor.execute(query, params)
+
+# Database functions
+def write_products(cursor, products: List[Dict], store: str, category: str, compare: bool = True) -> List[Dict]:
+    """Insert or update products, log price changes and update the stats (caller commits)
     
-    cursor = conn.cursor()
-    try:
-        hour_key = get_current_hour_key()
-        products_hash = create_products_hash(products)
-        
+    Returns the price changes found.
+    """
+    changes = []
+    new_products = 0
+    for product in products:
+        # Stable product ID: store product code, else URL digest, else name+size digest
+        candidates = identity_candidates(store, product)
+        if not candidates:
+            print("⚠️  Skipping product without code, URL or name")
+            continue
+        product_id = candidates[0]
+        
+        # Check if product exists, possibly under a weaker ID it was stored with before
         cursor.execute("""
-            INSERT INTO scraping_cache (store, category, hour_key, products_hash, products_count, changes_detected)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (store, category, hour_key) DO UPDATE SET
-                products_hash = EXCLUDED.products_hash,
-                products_count = EXCLUDED.products_count,
-                changes_detected = EXCLUDED.changes_detected,
-                scraped_at = CURRENT_TIMESTAMP
-        """, (store, category, hour_key, products_hash, len(products), changes_count))
+            SELECT id, price, product_id FROM products 
+            WHERE store = %s AND product_id = ANY(%s)
+            ORDER BY array_position(%s, product_id)
+            LIMIT 1
+        """, (store, candidates, candidates))
         
-        conn.commit()
+        existing = cursor.fetchone()
         
-    except Exception as e:
-        print(f"Error updating scrape cache: {e}")
-        conn.rollback()
-    finally:
-        cursor.close()
-        conn.close()
+        if existing and existing['product_id'] != product_id:
+            # Move the row to the stronger ID so its price history stays attached
+            cursor.execute("""
+                UPDATE products SET product_id = %s WHERE id = %s
+            """, (product_id, existing['id']))
+        
+        if existing:
+            # Product exists - check for price changes
+            # Convert both prices to float for comparison
+            old_price_float = float(existing['price']) if existing['price'] is not None else 0.0
+            new_price_float = float(product.get('price', 0)) if product.get('price') is not None else 0.0
+            
+            # Compare in integer cents so float rounding never reports a change
+            if compare and parse_cents(old_price_float) != parse_cents(new_price_float):
+                # Price changed
+                old_price = old_price_float
+                new_price = new_price_float
+                change_percent = ((new_price - old_price) / old_price) * 100 if old_price > 0 else 0
+                
+                changes.append({
+                    'product_name': product.get('name', ''),
+                    'old_price': old_price,
+                    'new_price': new_price,
+                    'change_percent': change_percent,
+                    'changed_at': datetime.now()
+                })
+                
+                # Update product
+                cursor.execute("""
+                    UPDATE products 
+                    SET name = %s, price = %s, image_url = %s, 
+                        scraped_at = %s, is_available = %s
+                    WHERE id = %s
+                """, (
+                    product.get('name', ''),
+                    product.get('price', 0),
+                    product.get('image_url', ''),
+                    datetime.now(),
+                    True,
+                    existing['id']
+                ))
+                
+                # Log price change
+                cursor.execute("""
+                    INSERT INTO price_history (product_id, old_price, new_price, changed_at)
+                    VALUES (%s, %s, %s, %s)
+                """, (existing['id'], old_price, new_price, datetime.now()))
+            else:
+                # Just update timestamp
+                cursor.execute("""
+                    UPDATE products SET scraped_at = %s, is_available = %s
+                    WHERE id = %s
+                """, (datetime.now(), True, existing['id']))
+        else:
+            # New product
+            cursor.execute("""
+                INSERT INTO products (store, category, product_id, name, price, image_url, scraped_at, is_available)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (store, product_id) DO UPDATE SET
+                    name = EXCLUDED.name,
+                    price = EXCLUDED.price,
+                    image_url = EXCLUDED.image_url,
+                    scraped_at = EXCLUDED.scraped_at,
+                    is_available = EXCLUDED.is_available
+                RETURNING (xmax = 0) AS inserted
+            """, (
+                store,
+                category,
+                product_id,
+                product.get('name', ''),
+                product.get('price', 0),
+                product.get('image_url', ''),
+                datetime.now(),
+                True
+            ))
+            # A concurrent scrape may have inserted it first
+            if cursor.fetchone()['inserted']:
+                new_products += 1
+    
+    record_stats(cursor, store, category, new_products=new_products, price_changes=len(changes))
+    return changes
 
-# Database functions
 def store_products(products: List[Dict], store: str, category: str, compare: bool = True):
     """Store scraped products in PostgreSQL"""
     conn = get_db_connection()
@@ -253,93 +531,12 @@ def store_products(products: List[Dict], store: str, category: str, compare: boo
         return []
     
     cursor = conn.cursor(cursor_factory=RealDictCursor)
-    changes = []
     
     print(f"📊 Storing {len(products)} products for {store} {category}")
     print(f"🔍 First product sample: {products[0] if products else 'No products'}")
     
     try:
-        for product in products:
-            # Get product ID with fallback
-            product_id = product.get('product_code', '') or f"fallback_{hash(product.get('name', ''))}"
-            
-            # Check if product exists
-            cursor.execute("""
-                SELECT id, price FROM products 
-                WHERE store = %s AND product_id = %s
-            """, (store, product_id))
-            
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Product exists - check for price changes
-                # Convert both prices to float for comparison
-                old_price_float = float(existing['price']) if existing['price'] is not None else 0.0
-                new_price_float = float(product.get('price', 0)) if product.get('price') is not None else 0.0
-                
-                if compare and old_price_float != new_price_float:
-                    # Price changed
-                    old_price = old_price_float
-                    new_price = new_price_float
-                    change_percent = ((new_price - old_price) / old_price) * 100 if old_price > 0 else 0
-                    
-                    changes.append({
-                        'product_name': product.get('name', ''),
-                        'old_price': old_price,
-                        'new_price': new_price,
-                        'change_percent': change_percent,
-                        'changed_at': datetime.now()
-                    })
-                    
-                    # Update product
-                    cursor.execute("""
-                        UPDATE products 
-                        SET name = %s, price = %s, image_url = %s, 
-                            scraped_at = %s, is_available = %s
-                        WHERE id = %s
-                    """, (
-                        product.get('name', ''),
-                        product.get('price', 0),
-                        product.get('image_url', ''),
-                        datetime.now(),
-                        True,
-                        existing['id']
-                    ))
-                    
-                    # Log price change
-                    cursor.execute("""
-                        INSERT INTO price_history (product_id, old_price, new_price, changed_at)
-                        VALUES (%s, %s, %s, %s)
-                    """, (existing['id'], old_price, new_price, datetime.now()))
-                else:
-                    # Just update timestamp
-                    cursor.execute("""
-                        UPDATE products SET scraped_at = %s, is_available = %s
-                        WHERE id = %s
-                    """, (datetime.now(), True, existing['id']))
-            else:
-                # New product - use a fallback ID if product_code is empty
-                product_id = product.get('product_code', '') or f"fallback_{hash(product.get('name', ''))}"
-                
-                cursor.execute("""
-                    INSERT INTO products (store, category, product_id, name, price, image_url, scraped_at, is_available)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (store, product_id) DO UPDATE SET
-                        name = EXCLUDED.name,
-                        price = EXCLUDED.price,
-                        image_url = EXCLUDED.image_url,
-                        scraped_at = EXCLUDED.scraped_at,
-                        is_available = EXCLUDED.is_available
-                """, (
-                    store,
-                    category,
-                    product_id,
-                    product.get('name', ''),
-                    product.get('price', 0),
-                    product.get('image_url', ''),
-                    datetime.now(),
-                    True
-                ))
+        changes = write_products(cursor, products, store, category, compare)
         
         conn.commit()
         print(f"✅ Successfully stored {len(products)} products with {len(changes)} changes")
@@ -354,6 +551,160 @@ def store_products(products: List[Dict], store: str, category: str, compare: boo
         cursor.close()
         conn.close()
 
+# Minutes after which an unfinished scrape's claim on an hour is taken over
+SCRAPE_CLAIM_TIMEOUT_MINUTES = int(os.getenv("SCRAPE_CLAIM_TIMEOUT_MINUTES", "30"))
+
+# Claims the hour's scraping_cache row and reads the previous products hash in one statement.
+# An unfinished claim has no products hash yet; a stale one can be taken over.
+SCRAPE_CLAIM_SQL = """
+    WITH previous AS (
+        SELECT products_hash FROM scraping_cache
+        WHERE store = %(store)s AND category = %(category)s AND products_hash IS NOT NULL
+        ORDER BY scraped_at DESC LIMIT 1
+    ), claimed AS (
+        INSERT INTO scraping_cache (store, category, hour_key)
+        VALUES (%(store)s, %(category)s, %(hour_key)s)
+        ON CONFLICT (store, category, hour_key) DO UPDATE SET scraped_at = CURRENT_TIMESTAMP
+        WHERE %(force)s OR (
+            scraping_cache.products_hash IS NULL
+            AND scraping_cache.scraped_at < CURRENT_TIMESTAMP - %(timeout)s * INTERVAL '1 minute'
+        )
+        RETURNING scraping_cache.scraped_at
+    )
+    SELECT (SELECT products_hash FROM previous) AS previous_hash,
+           (SELECT scraped_at FROM claimed) AS claimed_at
+"""
+
+class ScrapeSession:
+    """Database unit of work for one scrape of a store category
+    
+    claim() takes the current hour's scraping_cache row and reads the
+    previous products hash in one statement. The claim is committed right
+    away, so a concurrent scrape of the same category finds the row and
+    backs off instead of scraping the hour again. finish() writes products,
+    price history and the cache row in one transaction. release() drops a
+    claim whose scrape failed so the hour can be retried.
+    """
+    
+    def __init__(self, store: str, category: str, force: bool = False):
+        """Initialize session
+        
+        Args:
+            store: Store key
+            category: Category the products are stored under
+            force: Claim the hour even if it was already scraped
+        """
+        self.store = store
+        self.category = category
+        self.force = force
+        # Fixed for the session, so a scrape running past the hour finishes its own row
+        self.hour_key = get_current_hour_key()
+        self.previous_hash = ""
+        # scraped_at written by our claim (None until claimed), so release() only drops our own row
+        self.claimed_at = None
+    
+    def claim_params(self) -> Dict[str, Any]:
+        """Parameters of SCRAPE_CLAIM_SQL for this session"""
+        return {
+            'store': self.store,
+            'category': self.category,
+            'hour_key': self.hour_key,
+            'force': self.force,
+            'timeout': SCRAPE_CLAIM_TIMEOUT_MINUTES
+        }
+    
+    def claim(self) -> bool:
+        """Claim this hour for the scrape; False if it was already scraped (or is being scraped)"""
+        conn = get_db_connection()
+        if not conn:
+            return True  # If no DB, always scrape
+        
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            cursor.execute(SCRAPE_CLAIM_SQL, self.claim_params())
+            result = cursor.fetchone()
+            conn.commit()
+            
+            self.previous_hash = result['previous_hash'] or ""
+            # Set for a new row and for one taken over (forced or stale) alike
+            self.claimed_at = result['claimed_at']
+            return self.claimed_at is not None
+            
+        except Exception as e:
+            print(f"Error claiming scrape: {e}")
+            conn.rollback()
+            return True  # If error, scrape anyway
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def finish(self, products: List[Dict], compare: bool = True, changed: bool = True) -> List[Dict]:
+        """Store the scrape's results in one transaction
+        
+        Args:
+            products: Scraped products
+            compare: Record price changes against the stored prices
+            changed: Write products and history (False only records the scrape in the cache)
+        
+        Returns the price changes stored (empty if nothing could be written).
+        """
+        conn = get_db_connection()
+        if not conn:
+            print("❌ Database connection failed")
+            return []
+        
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            changes = []
+            if changed:
+                print(f"📊 Storing {len(products)} products for {self.store} {self.category}")
+                changes = write_products(cursor, products, self.store, self.category, compare)
+            write_scraping_cache(cursor, self.store, self.category, self.hour_key, products, len(changes))
+            conn.commit()
+            
+            if changed:
+                print(f"✅ Successfully stored {len(products)} products with {len(changes)} changes")
+            return changes
+            
+        except Exception as e:
+            print(f"❌ Database error: {e}")
+            conn.rollback()
+            self.release()
+            return []
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def release(self):
+        """Drop this session's unfinished claim so the hour can be scraped again
+        
+        Covers rows the claim inserted and rows it took over. A forced claim
+        of an already finished hour keeps its products hash and is left alone,
+        as is a row another session has since taken over.
+        """
+        if self.claimed_at is None:
+            return
+        
+        conn = get_db_connection()
+        if not conn:
+            return
+        
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM scraping_cache
+                WHERE store = %s AND category = %s AND hour_key = %s
+                  AND products_hash IS NULL AND scraped_at = %s
+            """, (self.store, self.category, self.hour_key, self.claimed_at))
+            conn.commit()
+            self.claimed_at = None
+        except Exception as e:
+            print(f"Error releasing scrape claim: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
 def check_database_for_products(store: str, category: str, limit: int = 100):
     """Check if products exist in database"""
     conn = get_db_connection()
@@ -389,8 +740,7 @@ def check_database_for_products(store: str, category: str, limit: int = 100):
 def store_products_in_background(products: List[Dict], store: str, category: str):
     """Store products in database (for background tasks)"""
     try:
-        changes = store_products(products, store, category, True)
-        update_scraping_cache(store, category, products, len(changes))
+        ScrapeSession(store, category).finish(products)
         print(f"✅ Background storage completed: {len(products)} products stored")
     except Exception as e:
         print(f"❌ Background storage error: {e}")
@@ -502,23 +852,8 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
     - **Changes detected**: Returns products with changes stored
     """
     
+    session = None
     try:
-        # Check if we should scrape now (hourly check) - unless force_fresh is True
-        if not request.force_fresh and not should_scrape_now(request.store, request.category):
-            return {
-                "message": f"Already scraped {request.store} {request.category} this hour",
-                "store": request.store,
-                "category": request.category,
-                "cached": True,
-                "hour_key": get_current_hour_key(),
-                "products_count": 0,
-                "price_changes": 0,
-                "changes": []
-            }
-        
-        # Get previous products hash for change detection
-        previous_hash = get_previous_products_hash(request.store, request.category)
-        
         # Initialize scraper based on store
         if request.store == "pnp":
             scraper = PnPScraper()  # PnP scraper doesn't use categories
@@ -533,6 +868,20 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
         else:
             raise HTTPException(status_code=400, detail="Invalid store. Use: pnp, shoprite, woolworths")
         
+        # Claim this hour (hourly check) and read the previous products hash - force_fresh always claims
+        session = ScrapeSession(request.store, request.category, force=request.force_fresh)
+        if not session.claim():
+            return {
+                "message": f"Already scraped {request.store} {request.category} this hour",
+                "store": request.store,
+                "category": request.category,
+                "cached": True,
+                "hour_key": session.hour_key,
+                "products_count": 0,
+                "price_changes": 0,
+                "changes": []
+            }
+        
         # Scrape products
         print(f"🔄 Scraping {request.store} {request.category}...")
         if request.store == "woolworths":
@@ -543,7 +892,7 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
         
         if not products:
             # Update cache even if no products found
-            update_scraping_cache(request.store, request.category, [], 0)
+            session.finish([], changed=False)
             return {
                 "message": "No products found",
                 "store": request.store,
@@ -556,9 +905,9 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
         # Check if products have changed (using hash comparison) - unless force_fresh is True
         current_hash = create_products_hash(products)
         
-        if not request.force_fresh and previous_hash and current_hash == previous_hash:
+        if not request.force_fresh and session.previous_hash and current_hash == session.previous_hash:
             # No changes detected, just update cache and return
-            update_scraping_cache(request.store, request.category, products, 0)
+            session.finish(products, changed=False)
             return {
                 "message": f"No changes detected in {request.store} {request.category}",
                 "store": request.store,
@@ -569,12 +918,9 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
                 "no_changes": True
             }
         
-        # Changes detected, store in database
+        # Changes detected, store products, price history and cache row in one transaction
         print(f"📊 Changes detected, storing {len(products)} products...")
-        changes = store_products(products, request.store, request.category, request.compare_with_existing)
-        
-        # Update cache with changes count
-        update_scraping_cache(request.store, request.category, products, len(changes))
+        changes = session.finish(products, request.compare_with_existing)
         
         return {
             "message": f"Changes detected and stored in {request.store} {request.category}",
@@ -583,11 +929,14 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
             "products_count": len(products),
             "price_changes": len(changes),
             "changes": changes[:10] if changes else [],  # Show first 10 changes
-            "hour_key": get_current_hour_key()
+            "hour_key": session.hour_key
         }
         
     except Exception as e:
         print(f"❌ Scraping error: {e}")
+        # Let the next request retry this hour
+        if session:
+            session.release()
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
 @app.get("/api/products",
@@ -598,51 +947,49 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
 async def get_products(
     store: Optional[str] = Query(None, description="Filter by store (pnp, shoprite, woolworths)"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    limit: int = Query(100, description="Limit number of results (max 1000)")
+    limit: int = Query(100, description=f"Page size (max {MAX_PAGE_SIZE})"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """
-    Get products from the database with optional filtering.
+    Get products from the database with optional filtering, newest first.
     
     **Filters:**
     - `store`: Filter by store (pnp, shoprite, woolworths)
     - `category`: Filter by category name
-    - `limit`: Maximum number of results (default: 100, max: 1000)
+    - `limit`: Page size (default: 100, max: 1000)
+    - `cursor`: Continue after the previous page (its `next_cursor`)
     
     **Returns:**
     - List of products with details
-    - Total count of matching products
+    - Number of products on this page
+    - `next_cursor` for the next page (null on the last page)
     """
+    limit = page_size(limit)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     conn = get_db_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    db_cursor = conn.cursor(cursor_factory=RealDictCursor)
     
     try:
-        query = "SELECT * FROM products WHERE 1=1"
-        params = []
-        
-        if store:
-            query += " AND store = %s"
-            params.append(store)
-        
-        if category:
-            query += " AND category = %s"
-            params.append(category)
-        
-        query += " ORDER BY scraped_at DESC LIMIT %s"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        products = cursor.fetchall()
+        # One extra row tells whether there is a next page
+        db_cursor.execute(*products_query(store, category, after, limit))
+        products = db_cursor.fetchall()
+        following = next_cursor(products, limit, 'scraped_at')
         
         return {
             "products": [dict(product) for product in products],
-            "count": len(products)
+            "count": len(products),
+            "next_cursor": following
         }
         
     finally:
-        cursor.close()
+        db_cursor.close()
         conn.close()
 
 @app.get("/api/price-changes",
@@ -651,42 +998,53 @@ async def get_products(
          response_description="Returns list of price changes with details",
          tags=["Data"])
 async def get_price_changes(
-    limit: int = Query(50, description="Limit number of results (max 1000)")
+    store: Optional[str] = Query(None, description="Filter by store (pnp, shoprite, woolworths)"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(50, description=f"Page size (max {MAX_PAGE_SIZE})"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """
-    Get recent price changes from the database.
+    Get recent price changes from the database, newest first.
+    
+    **Filters:**
+    - `store`: Only changes of this store's products
+    - `category`: Only changes of products in this category
+    - `limit`: Page size (default: 50, max: 1000)
+    - `cursor`: Continue after the previous page (its `next_cursor`)
     
     **Returns:**
     - List of price changes with product details
     - Old price, new price, and change percentage
     - Timestamp of when change was detected
     - Product name and details
+    - `next_cursor` for the next page (null on the last page)
     """
+    limit = page_size(limit)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     conn = get_db_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    db_cursor = conn.cursor(cursor_factory=RealDictCursor)
     
     try:
-        cursor.execute("""
-            SELECT p.name, ph.old_price, ph.new_price, 
-                   ((ph.new_price - ph.old_price) / ph.old_price * 100) as change_percent,
-                   ph.changed_at
-            FROM price_history ph
-            JOIN products p ON ph.product_id = p.id
-            ORDER BY ph.changed_at DESC
-            LIMIT %s
-        """, (limit,))
+        # One extra row tells whether there is a next page
+        db_cursor.execute(*price_changes_query(store, category, after, limit))
+        changes = db_cursor.fetchall()
+        following = next_cursor(changes, limit, 'changed_at')
         
-        changes = cursor.fetchall()
         return {
             "price_changes": [dict(change) for change in changes],
-            "count": len(changes)
+            "count": len(changes),
+            "next_cursor": following
         }
         
     finally:
-        cursor.close()
+        db_cursor.close()
         conn.close()
 
 @app.get("/api/categories",
@@ -774,10 +1132,18 @@ async def get_scrape_status(
          description="Get comprehensive scraping statistics and metrics",
          response_description="Returns statistics about products, price changes, and scraping activity",
          tags=["Monitoring"])
-async def get_stats():
+async def get_stats(
+    exact: bool = Query(False, description="Recount from the full tables (slow) and resync the running totals")
+):
     """
     Get comprehensive scraping statistics and metrics.
     
+    Counts come from running totals kept up to date as products are
+    stored, so the call costs the same however large the tables grow.
+    The 24h price change count is summed per hour. With `exact=true`
+    everything is recounted from the full tables and the totals are
+    corrected.
+    
     **Returns:**
     - Total products by store
     - Recent price changes (last 24 hours)
@@ -798,42 +1164,46 @@ async def get_stats():
     cursor = conn.cursor(cursor_factory=RealDictCursor)
     
     try:
+        if exact:
+            rebuild_stats(cursor)
+            conn.commit()
+        
+        # Recent price changes
+        cursor.execute(*recent_changes_query(exact))
+        recent_changes = cursor.fetchone()
+        
         # Total products by store
         cursor.execute("""
-            SELECT store, COUNT(*) as count 
-            FROM products 
+            SELECT store, SUM(products_count)::bigint as count 
+            FROM stats_summary 
             GROUP BY store
+            HAVING SUM(products_count) > 0
         """)
         store_stats = cursor.fetchall()
         
-        # Recent price changes
-        cursor.execute("""
-            SELECT COUNT(*) as recent_changes
-            FROM price_history 
-            WHERE changed_at > NOW() - INTERVAL '24 hours'
-        """)
-        recent_changes = cursor.fetchone()
-        
         # Total products
-        cursor.execute("SELECT COUNT(*) as total_products FROM products")
-        total_products = cursor.fetchone()
+        total_products = sum(stat['count'] for stat in store_stats)
         
         # Scraping cache stats
         cursor.execute("""
-            SELECT COUNT(*) as total_scrapes,
-                   COUNT(DISTINCT store) as stores_scraped,
-                   COUNT(DISTINCT category) as categories_scraped
-            FROM scraping_cache
+            SELECT COALESCE(SUM(scrapes_count), 0)::bigint as total_scrapes,
+                   COUNT(DISTINCT store) FILTER (WHERE scrapes_count > 0) as stores_scraped,
+                   COUNT(DISTINCT category) FILTER (WHERE scrapes_count > 0) as categories_scraped
+            FROM stats_summary
         """)
         scrape_stats = cursor.fetchone()
         
         return {
             "products_by_store": [dict(stat) for stat in store_stats],
-            "total_products": total_products['total_products'] if total_products else 0,
+            "total_products": total_products,
             "recent_price_changes_24h": recent_changes['recent_changes'] if recent_changes else 0,
-            "scraping_stats": dict(scrape_stats) if scrape_stats else {}
+            "scraping_stats": dict(scrape_stats) if scrape_stats else {},
+            "exact": exact
         }
         
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Stats failed: {str(e)}")
     finally:
         cursor.close()
         conn.close()
@@ -921,6 +1291,7 @@ async def clear_scraping_cache(
             cursor.execute("DELETE FROM scraping_cache")
             message = "Cleared all scraping cache"
         
+        recount_scrapes(cursor, store, category if store else None)
         conn.commit()
         return {"message": message, "status": "success"}
         
@@ -1132,8 +1503,7 @@ async def get_shoprite_fresh_meat_poultry(
         if not products:
             return {"message": f"No Fresh Meat & Poultry products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Fresh Meat & Poultry"}
         
-        changes = store_products(products, "shoprite", "Fresh Meat & Poultry", True)
-        update_scraping_cache("shoprite", "Fresh Meat & Poultry", products, len(changes))
+        changes = ScrapeSession("shoprite", "Fresh Meat & Poultry").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Fresh Meat & Poultry products from page {page}",
@@ -1168,8 +1538,7 @@ async def get_shoprite_frozen_meat_poultry(
         if not products:
             return {"message": f"No Frozen Meat & Poultry products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Frozen Meat & Poultry"}
         
-        changes = store_products(products, "shoprite", "Frozen Meat & Poultry", True)
-        update_scraping_cache("shoprite", "Frozen Meat & Poultry", products, len(changes))
+        changes = ScrapeSession("shoprite", "Frozen Meat & Poultry").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Frozen Meat & Poultry products from page {page}",
@@ -1204,8 +1573,7 @@ async def get_shoprite_milk_butter_eggs(
         if not products:
             return {"message": f"No Milk, Butter & Eggs products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Milk, Butter & Eggs"}
         
-        changes = store_products(products, "shoprite", "Milk, Butter & Eggs", True)
-        update_scraping_cache("shoprite", "Milk, Butter & Eggs", products, len(changes))
+        changes = ScrapeSession("shoprite", "Milk, Butter & Eggs").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Milk, Butter & Eggs products from page {page}",
@@ -1240,8 +1608,7 @@ async def get_shoprite_cheese(
         if not products:
             return {"message": f"No Cheese products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Cheese"}
         
-        changes = store_products(products, "shoprite", "Cheese", True)
-        update_scraping_cache("shoprite", "Cheese", products, len(changes))
+        changes = ScrapeSession("shoprite", "Cheese").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Cheese products from page {page}",
@@ -1276,8 +1643,7 @@ async def get_shoprite_yoghurt(
         if not products:
             return {"message": f"No Yoghurt products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Yoghurt"}
         
-        changes = store_products(products, "shoprite", "Yoghurt", True)
-        update_scraping_cache("shoprite", "Yoghurt", products, len(changes))
+        changes = ScrapeSession("shoprite", "Yoghurt").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Yoghurt products from page {page}",
@@ -1312,8 +1678,7 @@ async def get_shoprite_fresh_fruit(
         if not products:
             return {"message": f"No Fresh Fruit products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Fresh Fruit"}
         
-        changes = store_products(products, "shoprite", "Fresh Fruit", True)
-        update_scraping_cache("shoprite", "Fresh Fruit", products, len(changes))
+        changes = ScrapeSession("shoprite", "Fresh Fruit").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Fresh Fruit products from page {page}",
@@ -1348,8 +1713,7 @@ async def get_shoprite_fresh_vegetables(
         if not products:
             return {"message": f"No Fresh Vegetables products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Fresh Vegetables"}
         
-        changes = store_products(products, "shoprite", "Fresh Vegetables", True)
-        update_scraping_cache("shoprite", "Fresh Vegetables", products, len(changes))
+        changes = ScrapeSession("shoprite", "Fresh Vegetables").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Fresh Vegetables products from page {page}",
@@ -1384,8 +1748,7 @@ async def get_shoprite_fresh_salad_herbs_dip(
         if not products:
             return {"message": f"No Fresh Salad, Herbs & Dip products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Fresh Salad, Herbs & Dip"}
         
-        changes = store_products(products, "shoprite", "Fresh Salad, Herbs & Dip", True)
-        update_scraping_cache("shoprite", "Fresh Salad, Herbs & Dip", products, len(changes))
+        changes = ScrapeSession("shoprite", "Fresh Salad, Herbs & Dip").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Fresh Salad, Herbs & Dip products from page {page}",
@@ -1420,8 +1783,7 @@ async def get_shoprite_bakery(
         if not products:
             return {"message": f"No Bakery products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Bakery"}
         
-        changes = store_products(products, "shoprite", "Bakery", True)
-        update_scraping_cache("shoprite", "Bakery", products, len(changes))
+        changes = ScrapeSession("shoprite", "Bakery").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Bakery products from page {page}",
@@ -1456,8 +1818,7 @@ async def get_shoprite_frozen_food(
         if not products:
             return {"message": f"No Frozen Food products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Frozen Food"}
         
-        changes = store_products(products, "shoprite", "Frozen Food", True)
-        update_scraping_cache("shoprite", "Frozen Food", products, len(changes))
+        changes = ScrapeSession("shoprite", "Frozen Food").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Frozen Food products from page {page}",
@@ -1492,8 +1853,7 @@ async def get_shoprite_chocolates_sweets(
         if not products:
             return {"message": f"No Chocolates & Sweets products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Chocolates & Sweets"}
         
-        changes = store_products(products, "shoprite", "Chocolates & Sweets", True)
-        update_scraping_cache("shoprite", "Chocolates & Sweets", products, len(changes))
+        changes = ScrapeSession("shoprite", "Chocolates & Sweets").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Chocolates & Sweets products from page {page}",
@@ -1528,8 +1888,7 @@ async def get_shoprite_ready_meals(
         if not products:
             return {"message": f"No Ready Meals products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Ready Meals"}
         
-        changes = store_products(products, "shoprite", "Ready Meals", True)
-        update_scraping_cache("shoprite", "Ready Meals", products, len(changes))
+        changes = ScrapeSession("shoprite", "Ready Meals").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Ready Meals products from page {page}",
@@ -1566,8 +1925,7 @@ async def get_woolworths_meat_poultry_fish(
         if not products:
             return {"message": f"No Meat, Poultry & Fish products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Meat, Poultry & Fish"}
         
-        changes = store_products(products, "woolworths", "Meat, Poultry & Fish", True)
-        update_scraping_cache("woolworths", "Meat, Poultry & Fish", products, len(changes))
+        changes = ScrapeSession("woolworths", "Meat, Poultry & Fish").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Meat, Poultry & Fish products from page {page}",
@@ -1598,8 +1956,7 @@ async def get_woolworths_fruit_vegetables_salads(
         if not products:
             return {"message": f"No Fruit, Vegetables & Salads products found on page {page}", "page": page, "products_count": 0, "products": [], "category": "Fruit, Vegetables & Salads"}
         
-        changes = store_products(products, "woolworths", "Fruit, Vegetables & Salads", True)
-        update_scraping_cache("woolworths", "Fruit, Vegetables & Salads", products, len(changes))
+        changes = ScrapeSession("woolworths", "Fruit, Vegetables & Salads").finish(products)
         
         return {
             "message": f"Successfully scraped {len(products)} Fruit, Vegetables & Salads products from page {page}",
@@ -1630,6 +1987,7 @@ async def force_scrape(
                     DELETE FROM scraping_cache 
                     WHERE store = %s AND category = %s
                 """, (store, category))
+                recount_scrapes(cursor, store, category)
                 conn.commit()
                 cursor.close()
                 conn.close()
@@ -1662,12 +2020,9 @@ async def force_scrape(
                 "changes": []
             }
         
-        # Store products in database
+        # Store products, price history and cache row together
         print(f"📊 Storing {len(products)} products...")
-        changes = store_products(products, store, category, True)
-        
-        # Update cache
-        update_scraping_cache(store, category, products, len(changes))
+        changes = ScrapeSession(store, category).finish(products)
         
         return {
             "message": f"Force scrape completed for {store} {category}",
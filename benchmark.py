@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the grocery scrapers and API
+Run all benchmarks:      python benchmark.py
+Run selected benchmarks: python benchmark.py import_time price_parser
+"""
+
+import json
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Saved retailer pages used as parsing fixtures
+PAGE_FIXTURES = ('old_files/shoprite_page_source.html', 'old_files/pnp_page_source.html')
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Parse `python -X importtime` output into module -> cumulative microseconds"""
+    timings = {}
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)', line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+    return timings
+
+
+def measure_import(module: str, runs: int = 5) -> Dict:
+    """Import a module in fresh interpreters and report the best cumulative time"""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        
+        timings = parse_importtime(result.stderr)
+        if best is None or timings[module] < best[module]:
+            best = timings
+    
+    return {
+        'module': module,
+        'total_ms': round(best[module] / 1000, 1),
+        'selenium_loaded': any(name == 'selenium' or name.startswith('selenium.') for name in best),
+        'bs4_loaded': 'bs4' in best,
+        'slowest': sorted(
+            ({'module': name, 'ms': round(us / 1000, 1)} for name, us in best.items()
+             if name != module and '.' not in name),
+            key=lambda item: item['ms'], reverse=True
+        )[:5]
+    }
+
+
+def bench_import_time() -> List[Dict]:
+    """Cold-start import cost of the API and each scraper module"""
+    return [measure_import(module) for module in ('api', 'shoprite_scraper', 'pnp_scraper', 'woolworths_scraper')]
+
+
+def fixture_price_texts() -> List[str]:
+    """Text lines from the fixture pages that contain a Rand amount"""
+    from bs4 import BeautifulSoup
+    
+    texts = []
+    for path in PAGE_FIXTURES:
+        with open(path, 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        for line in soup.get_text('\n').splitlines():
+            line = line.strip()
+            if line and re.search(r'R\s?\d', line):
+                texts.append(line)
+    return texts
+
+
+def time_per_call(func, values: List[str], rounds: int = 200) -> float:
+    """Average microseconds per call of func over values"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            func(value)
+    return round((time.perf_counter() - start) / (rounds * len(values)) * 1e6, 2)
+
+
+def bench_price_parser() -> Dict:
+    """Throughput of the shared money parser on price text from the fixture pages"""
+    from money import parse_cents, parse_prices
+    
+    texts = fixture_price_texts()
+    return {
+        'price_texts': len(texts),
+        'parsed': sum(1 for text in texts if parse_cents(text) is not None),
+        'with_was_price': sum(1 for text in texts if parse_prices(text)['was'] is not None),
+        'parse_cents_us': time_per_call(parse_cents, texts),
+        'parse_prices_us': time_per_call(parse_prices, texts),
+        'samples': [{'text': text[:60], 'cents': parse_cents(text)} for text in texts[:5]]
+    }
+
+
+def bench_shoprite_embedded() -> Dict:
+    """Embedded-JSON vs DOM extraction on the Shoprite fixture, with a field parity check"""
+    import contextlib
+    import io
+    from bs4 import BeautifulSoup
+    from shoprite_scraper import PARITY_FIELDS, ShopriteScraper
+    
+    with open('old_files/shoprite_page_source.html', 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    scraper = ShopriteScraper()
+    
+    def run(extract, rounds: int = 5):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(rounds):
+                products = extract(soup)
+        return products, round((time.perf_counter() - start) / rounds * 1000, 2)
+    
+    embedded, embedded_ms = run(scraper.extract_embedded_products)
+    dom, dom_ms = run(scraper.extract_dom_products)
+    
+    # Promotional prices come from the same markup in both paths
+    promo_fields = ('special_price', 'original_price', 'savings')
+    mismatches = {}
+    for json_product, dom_product in zip(embedded, dom):
+        checked = PARITY_FIELDS + (promo_fields if json_product['on_special'] else ())
+        for field in checked:
+            if json_product[field] != dom_product[field]:
+                mismatches.setdefault(field, []).append(dom_product['name'])
+    
+    return {
+        'embedded_products': len(embedded),
+        'dom_products': len(dom),
+        'embedded_ms': embedded_ms,
+        'dom_ms': dom_ms,
+        'parity': len(embedded) == len(dom) and not mismatches,
+        'mismatches': mismatches
+    }
+
+
+def bench_memory(pages: int = 100) -> Dict:
+    """Resident memory while crawling the Shoprite fixture as a pages-long crawl
+    
+    RSS should stay flat apart from the (small) product records kept, since
+    each page's parse tree is decomposed once its products are extracted.
+    """
+    import contextlib
+    import gc
+    import io
+    from memory_guard import current_rss_bytes
+    from shoprite_scraper import ShopriteScraper
+    
+    with open('old_files/shoprite_page_source.html', 'r', encoding='utf-8') as f:
+        html = f.read()
+    
+    scraper = ShopriteScraper()
+    scraper.fetch_page = lambda url: html
+    scraper.context.pause = lambda seconds: None
+    
+    def rss_mb() -> float:
+        return round(current_rss_bytes() / (1024 * 1024), 1)
+    
+    samples = []
+    kept = 0
+    gc.collect()
+    baseline = rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for page, products in enumerate(scraper.iter_pages(max_pages=pages), 1):
+            kept += len(products)
+            if page % 10 == 0:
+                samples.append({'page': page, 'rss_mb': rss_mb()})
+    
+    return {
+        'pages': pages,
+        'products_kept': kept,
+        'baseline_rss_mb': baseline,
+        'samples': samples,
+        'growth_after_page_10_mb': round(samples[-1]['rss_mb'] - samples[0]['rss_mb'], 1)
+    }
+
+
+BENCHMARKS = {
+    'import_time': bench_import_time,
+    'price_parser': bench_price_parser,
+    'shoprite_embedded': bench_shoprite_embedded,
+    'memory': bench_memory,
+}
+
+
+def main():
+    selected = sys.argv[1:] or list(BENCHMARKS.keys())
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(BENCHMARKS.keys())}")
+        sys.exit(1)
+    
+    results = {}
+    for name in selected:
+        print(f"Running {name}...")
+        results[name] = BENCHMARKS[name]()
+    
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
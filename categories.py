@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Store category registries
+Listing URLs for every category the API serves. Kept free of scraper
+imports so the API can read them without loading requests, BeautifulSoup
+or Selenium.
+"""
+
+
+# Available Shoprite categories (facets of the Food department)
+SHOPRITE_CATEGORIES = {
+    'all-products': {
+        'name': 'All Products',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'food-cupboard': {
+        'name': 'Food Cupboard',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afood_cupboard%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afood_cupboard%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'fresh-meat-poultry': {
+        'name': 'Fresh Meat & Poultry',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'frozen-meat-poultry': {
+        'name': 'Frozen Meat & Poultry',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_meat_and_poultry%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'milk-butter-eggs': {
+        'name': 'Milk, Butter & Eggs',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Amilk_butter_and_eggs%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Amilk_butter_and_eggs%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'cheese': {
+        'name': 'Cheese',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Acheese%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Acheese%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'yoghurt': {
+        'name': 'Yoghurt',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Ayoghurt%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Ayoghurt%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'fresh-fruit': {
+        'name': 'Fresh Fruit',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_fruit%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_fruit%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'fresh-vegetables': {
+        'name': 'Fresh Vegetables',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_vegetables%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_vegetables%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'fresh-salad-herbs-dip': {
+        'name': 'Fresh Salad, Herbs & Dip',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_salad_herbs_and_dip%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afresh_salad_herbs_and_dip%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'bakery': {
+        'name': 'Bakery',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Abakery%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Abakery%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'frozen-food': {
+        'name': 'Frozen Food',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_food%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Afrozen_food%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'chocolates-sweets': {
+        'name': 'Chocolates & Sweets',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Achocolates_and_sweets%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Achocolates_and_sweets%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    },
+    'ready-meals': {
+        'name': 'Ready Meals',
+        'url': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Aready_meals%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page=0',
+        'paginated': 'https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AallCategories%3Aready_meals%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}'
+    }
+}
+
+
+# Available Pick n Pay listings (page 2 onwards uses currentPage=1, 2, ...)
+PNP_CATEGORIES = {
+    'all-products': {
+        'name': 'All Products',
+        'url': 'https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase',
+        'paginated': 'https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase&currentPage={page}'
+    },
+    'promotions': {
+        'name': 'Promotions',
+        'url': 'https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase:isOnPromotion:On%20Promotion',
+        'paginated': 'https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase:isOnPromotion:On%20Promotion&currentPage={page}'
+    }
+}
+
+
+# Woolworths listings are paginated by product offset (No=24, 48, ...)
+WOOLWORTHS_PAGE_SIZE = 24
+
+# Available Woolworths categories
+WOOLWORTHS_CATEGORIES = {
+    'fruit-vegetables': {
+        'name': 'Fruit, Vegetables & Salads',
+        'url': 'https://www.woolworths.co.za/cat/Food/Fruit-Vegetables-Salads/_/N-lllnam',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Fruit-Vegetables-Salads/_/N-lllnam?No={page}&Nrpp=24'
+    },
+    'meat-poultry': {
+        'name': 'Meat, Poultry & Fish',
+        'url': 'https://www.woolworths.co.za/cat/Food/Meat-Poultry-Fish/_/N-d87rb7',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Meat-Poultry-Fish/_/N-d87rb7?No={page}&Nrpp=24'
+    },
+    'dairy-eggs': {
+        'name': 'Milk, Dairy & Eggs',
+        'url': 'https://www.woolworths.co.za/cat/Food/Milk-Dairy-Eggs/_/N-1sqo44p',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Milk-Dairy-Eggs/_/N-1sqo44p?No={page}&Nrpp=24'
+    },
+    'ready-meals': {
+        'name': 'Ready Meals',
+        'url': 'https://www.woolworths.co.za/cat/Food/Ready-Meals/_/N-s2csbp',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Ready-Meals/_/N-s2csbp?No={page}&Nrpp=24'
+    },
+    'deli-entertaining': {
+        'name': 'Deli & Entertaining',
+        'url': 'https://www.woolworths.co.za/cat/Food/Deli-Entertaining/_/N-13b8g51',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Deli-Entertaining/_/N-13b8g51?No={page}&Nrpp=24'
+    },
+    'food-to-go': {
+        'name': 'Food To Go',
+        'url': 'https://www.woolworths.co.za/cat/Food/Food-To-Go/_/N-11buko0',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Food-To-Go/_/N-11buko0?No={page}&Nrpp=24'
+    },
+    'bakery': {
+        'name': 'Bakery',
+        'url': 'https://www.woolworths.co.za/cat/Food/Bakery/_/N-1bm2new',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Bakery/_/N-1bm2new?No={page}&Nrpp=24'
+    },
+    'frozen-food': {
+        'name': 'Frozen Food',
+        'url': 'https://www.woolworths.co.za/cat/Food/Frozen-Food/_/N-j8pkwq',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Frozen-Food/_/N-j8pkwq?No={page}&Nrpp=24'
+    },
+    'pantry': {
+        'name': 'Pantry',
+        'url': 'https://www.woolworths.co.za/cat/Food/Pantry/_/N-1lw4dzx',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Pantry/_/N-1lw4dzx?No={page}&Nrpp=24'
+    },
+    'chocolates-sweets': {
+        'name': 'Chocolates, Sweets & Snacks',
+        'url': 'https://www.woolworths.co.za/cat/Food/Chocolates-Sweets-Snacks/_/N-1yz1i0m',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Chocolates-Sweets-Snacks/_/N-1yz1i0m?No={page}&Nrpp=24'
+    },
+    'beverages': {
+        'name': 'Beverages & Juices',
+        'url': 'https://www.woolworths.co.za/cat/Food/Beverages-Juices/_/N-mnxddc',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Beverages-Juices/_/N-mnxddc?No={page}&Nrpp=24'
+    },
+    'pets': {
+        'name': 'Pets',
+        'url': 'https://www.woolworths.co.za/cat/Food/Pets/_/N-l1demz',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Pets/_/N-l1demz?No={page}&Nrpp=24'
+    },
+    'household': {
+        'name': 'Household',
+        'url': 'https://www.woolworths.co.za/cat/Food/Household/_/N-vvikef',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Household/_/N-vvikef?No={page}&Nrpp=24'
+    },
+    'cleaning': {
+        'name': 'Cleaning',
+        'url': 'https://www.woolworths.co.za/cat/Food/Cleaning/_/N-o1v4pe',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Cleaning/_/N-o1v4pe?No={page}&Nrpp=24'
+    },
+    'toiletries-health': {
+        'name': 'Toiletries & Health',
+        'url': 'https://www.woolworths.co.za/cat/Food/Toiletries-Health/_/N-1q1wl1r',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Toiletries-Health/_/N-1q1wl1r?No={page}&Nrpp=24'
+    },
+    'kids': {
+        'name': 'Kids',
+        'url': 'https://www.woolworths.co.za/cat/Food/Kids/_/N-ymaf0z',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Kids/_/N-ymaf0z?No={page}&Nrpp=24'
+    },
+    'flowers-plants': {
+        'name': 'Flowers & Plants',
+        'url': 'https://www.woolworths.co.za/cat/Food/Flowers-Plants/_/N-1z13rv1',
+        'paginated': 'https://www.woolworths.co.za/cat/Food/Flowers-Plants/_/N-1z13rv1?No={page}&Nrpp=24'
+    }
+}
+
+
+# Registries by store key, as used in API routes
+STORE_CATEGORIES = {
+    'shoprite': SHOPRITE_CATEGORIES,
+    'picknpay': PNP_CATEGORIES,
+    'woolworths': WOOLWORTHS_CATEGORIES
+}
+
+
+def get_category_url(store: str, category: str, page: int = 0) -> str:
+    """Build the listing URL for a category page (0-indexed)
+    
+    Args:
+        store: 'shoprite', 'picknpay' or 'woolworths'
+        category: Category key from the store's registry
+        page: Page number (0-indexed)
+    """
+    registry = STORE_CATEGORIES.get(store)
+    if registry is None:
+        available = ', '.join(STORE_CATEGORIES.keys())
+        raise ValueError(f"Invalid store '{store}'. Available: {available}")
+    
+    if category not in registry:
+        available = ', '.join(registry.keys())
+        raise ValueError(f"Invalid category '{category}'. Available: {available}")
+    
+    category_info = registry[category]
+    if page == 0:
+        return category_info['url']
+    if store == 'woolworths':
+        return category_info['paginated'].format(page=page * WOOLWORTHS_PAGE_SIZE)
+    return category_info['paginated'].format(page=page)
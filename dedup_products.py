@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+One-off product dedup job
+Rows stored before product ids were deterministic got a hash()-based
+"fallback_" id that changed on every process restart, so the same product
+was inserted again after each deploy. This merges every group of such rows
+(same store, normalized name and pack size) into one canonical row: price
+history is repointed to it, the duplicates are deleted and the canonical
+row gets the name-based id the API now assigns.
+
+Runs as a dry run unless --apply is given; --apply does everything in one
+transaction.
+
+Usage: python dedup_products.py [--apply]
+"""
+
+import sys
+from collections import defaultdict
+from psycopg2.extras import RealDictCursor
+from api_old import get_db_connection, rebuild_stats
+from product_identity import LEGACY_PREFIX, name_identity
+
+
+def find_duplicate_groups(cursor):
+    """Group legacy rows (and rows already on a name id) by store and name identity"""
+    cursor.execute("""
+        SELECT id, store, product_id, name, scraped_at FROM products
+        WHERE product_id LIKE %s OR product_id LIKE %s
+        ORDER BY scraped_at DESC NULLS LAST, id DESC
+    """, (LEGACY_PREFIX + '%', 'name\\_%'))
+    
+    groups = defaultdict(list)
+    for row in cursor.fetchall():
+        identity = name_identity(row['store'], row['name'])
+        if identity:
+            groups[(row['store'], identity)].append(row)
+    return groups
+
+
+def choose_canonical(identity: str, rows):
+    """Row to keep: the one already on the name id, else the most recently scraped"""
+    for row in rows:
+        if row['product_id'] == identity:
+            return row
+    return rows[0]
+
+
+def dedup_products(apply: bool = False):
+    """Merge duplicate legacy product rows
+    
+    Args:
+        apply: Write the changes (default: only report what would change)
+    """
+    conn = get_db_connection()
+    if not conn:
+        print("❌ No database connection")
+        return False
+    
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    merged_groups = 0
+    deleted_rows = 0
+    renamed_rows = 0
+    
+    try:
+        groups = find_duplicate_groups(cursor)
+        
+        for (store, identity), rows in groups.items():
+            canonical = choose_canonical(identity, rows)
+            duplicates = [row['id'] for row in rows if row['id'] != canonical['id']]
+            
+            if duplicates:
+                merged_groups += 1
+                deleted_rows += len(duplicates)
+                print(f"🔗 {store}: '{canonical['name']}' - keeping row {canonical['id']}, "
+                      f"merging {len(duplicates)} duplicate(s)")
+                
+                # Keep the price history of every duplicate on the surviving row
+                cursor.execute("""
+                    UPDATE price_history SET product_id = %s WHERE product_id = ANY(%s)
+                """, (canonical['id'], duplicates))
+                cursor.execute("""
+                    DELETE FROM products WHERE id = ANY(%s)
+                """, (duplicates,))
+            
+            if canonical['product_id'] != identity:
+                renamed_rows += 1
+                cursor.execute("""
+                    UPDATE products SET product_id = %s WHERE id = %s
+                """, (identity, canonical['id']))
+        
+        # Deleted rows leave the running product counts too high
+        if deleted_rows:
+            rebuild_stats(cursor)
+        
+        if apply:
+            conn.commit()
+            print(f"✅ Merged {merged_groups} group(s): deleted {deleted_rows} duplicate row(s), "
+                  f"moved {renamed_rows} row(s) to name ids")
+        else:
+            conn.rollback()
+            print(f"🔍 Dry run: would merge {merged_groups} group(s), delete {deleted_rows} duplicate row(s) "
+                  f"and move {renamed_rows} row(s) to name ids. Re-run with --apply to write.")
+        return True
+    
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Dedup failed, nothing changed: {e}")
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    ok = dedup_products(apply="--apply" in sys.argv[1:])
+    sys.exit(0 if ok else 1)
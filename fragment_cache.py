@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Product fragment cache
+Hashes the raw markup of every product container and remembers the record
+extracted from it, so a re-scrape only runs extraction for containers whose
+markup changed since the last run. Hashes are kept per (store, category)
+in small JSON files that survive restarts.
+
+Container markup is sliced straight out of the page source using the
+source positions html.parser records on each tag, which is much cheaper
+than re-serializing the tag.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, Type
+from product_record import ProductRecord
+
+NEWLINE_RE = re.compile('\n')
+UNSAFE_FILENAME_RE = re.compile(r'[^\w-]+')
+
+# Part of every key: bump when extraction changes so records made by older code are not reused
+EXTRACTION_VERSION = 3
+
+
+class PageSource:
+    """Raw markup of a parsed page, sliced per element"""
+    
+    def __init__(self, markup: str):
+        self.markup = markup
+        # Offset of the first character of every line (tag.sourceline is 1-based)
+        self.line_starts = [0] + [match.end() for match in NEWLINE_RE.finditer(markup)]
+    
+    def offset(self, tag) -> Optional[int]:
+        """Offset of tag's start in the markup (None if the parser recorded no position)"""
+        if getattr(tag, 'sourceline', None) is None:
+            return None
+        return self.line_starts[tag.sourceline - 1] + tag.sourcepos
+    
+    def fragment(self, tag) -> Optional[str]:
+        """Markup from tag's start up to the next element that follows its subtree"""
+        start = self.offset(tag)
+        if start is None:
+            return None
+        
+        end = None
+        node = tag
+        while node is not None and end is None:
+            sibling = node.next_sibling
+            # Skip text and comments, which carry no source position
+            while sibling is not None and self.offset(sibling) is None:
+                sibling = sibling.next_sibling
+            if sibling is not None:
+                end = self.offset(sibling)
+            node = node.parent
+        return self.markup[start:end]
+
+
+class CategoryFragments:
+    """Fragment hash -> extracted record values for one (store, category)"""
+    
+    def __init__(self, path: Optional[str], max_age_seconds: int, max_entries: int):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        # digest -> [last seen (epoch seconds), record values in FIELDS order]
+        self.records: Dict[str, list] = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load fragment cache {self.path}: {e}")
+    
+    @staticmethod
+    def key(fragment: str, fields: Optional[Tuple[str, ...]] = None) -> str:
+        """Digest of a container's markup and the fields extracted from it"""
+        # The same fields in any order extract the same record
+        fields = tuple(sorted(fields)) if fields is not None else None
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((EXTRACTION_VERSION, fields)).encode())
+        digest.update(fragment.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+    
+    def get(self, key: str, record_type: Type[ProductRecord], scraped_at: str) -> Optional[ProductRecord]:
+        """Fresh copy of the record extracted from identical markup, or None"""
+        with self.lock:
+            entry = self.records.get(key)
+            if entry is None:
+                return None
+            # Refreshing last-seen hourly is enough for expiry and avoids rewriting the map every page
+            now = int(time.time())
+            if entry[0] < now - 3600:
+                entry[0] = now
+                self.dirty = True
+        record = record_type.from_values(entry[1])
+        record['scraped_at'] = scraped_at
+        return record
+    
+    def put(self, key: str, record: ProductRecord):
+        """Remember the record extracted from the markup behind key"""
+        with self.lock:
+            self.records[key] = [int(time.time()), record.values()]
+            self.dirty = True
+    
+    def extract(self, source: Optional[PageSource], container, fields: Optional[Tuple[str, ...]],
+                record_type: Type[ProductRecord], scraped_at: str,
+                extract: Callable[[], ProductRecord], extra: str = '') -> Tuple[ProductRecord, bool]:
+        """Reuse the record for unchanged container markup, otherwise call extract()
+        
+        Args:
+            source: Page markup (None disables reuse, e.g. for pages passed in pre-parsed)
+            container: Product container element
+            fields: Fields being extracted
+            record_type: Record class to rebuild cached values into
+            scraped_at: Timestamp for a reused record
+            extract: Runs the full extraction for the container
+            extra: Data from outside the container that the record also depends on
+        
+        Returns (record, reused).
+        """
+        fragment = source.fragment(container) if source else None
+        if fragment is None:
+            return extract(), False
+        
+        key = self.key(fragment + extra, fields)
+        record = self.get(key, record_type, scraped_at)
+        if record is not None:
+            return record, True
+        
+        record = extract()
+        if record is not None and record.get('name'):
+            self.put(key, record)
+        return record, False
+    
+    def save(self):
+        """Drop stale hashes and persist the map if it changed"""
+        if not self.path or not self.dirty:
+            return
+        
+        with self.lock:
+            cutoff = time.time() - self.max_age_seconds
+            records = {key: entry for key, entry in self.records.items() if entry[0] >= cutoff}
+            if len(records) > self.max_entries:
+                newest = sorted(records.items(), key=lambda item: item[1][0], reverse=True)
+                records = dict(newest[:self.max_entries])
+            self.records = records
+            self.dirty = False
+            data = json.dumps(records, ensure_ascii=False, separators=(',', ':'))
+        
+        directory = os.path.dirname(self.path) or '.'
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file of our own first so a crash never leaves a half-written
+            # map and concurrent saves never write into each other's file
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save fragment cache {self.path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class FragmentCache:
+    """Per-category fragment maps, loaded on first use and shared by all scrapers"""
+    
+    def __init__(self, directory: Optional[str] = "fragments", max_age_seconds: int = 3 * 24 * 3600,
+                 max_entries: int = 20000):
+        """Initialize cache
+        
+        Args:
+            directory: Folder holding one JSON map per store and category (None keeps maps in memory)
+            max_age_seconds: Hashes not seen for this long are dropped on save (default: 3 days)
+            max_entries: Most hashes kept per category
+        """
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self.categories: Dict[Tuple[str, str], CategoryFragments] = {}
+        self.last_saved = 0.0
+        self.lock = threading.Lock()
+    
+    def category(self, store: str, category: str) -> CategoryFragments:
+        """Fragment map for a store and category"""
+        with self.lock:
+            fragments = self.categories.get((store, category))
+            if fragments is None:
+                name = UNSAFE_FILENAME_RE.sub('_', f"{store}__{category}").strip('_')
+                path = os.path.join(self.directory, f"{name}.json") if self.directory else None
+                fragments = CategoryFragments(path, self.max_age_seconds, self.max_entries)
+                self.categories[(store, category)] = fragments
+            return fragments
+    
+    def save(self, min_interval_seconds: float = 0):
+        """Persist every map that changed (called once per scrape, not per page)
+        
+        Args:
+            min_interval_seconds: Skip the save if the last one was more recent than this
+        """
+        with self.lock:
+            now = time.time()
+            if now - self.last_saved < min_interval_seconds:
+                return
+            self.last_saved = now
+            categories = list(self.categories.values())
+        
+        for fragments in categories:
+            fragments.save()
+
+
+# Shared by every scraper instance in the process
+fragment_cache = FragmentCache(os.getenv("FRAGMENT_CACHE_DIR", "fragments") or None)
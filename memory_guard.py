@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Memory guard
+Holds back new page fetches while the process's resident memory is above
+a budget, so a few concurrent large pages don't get a small instance
+OOM-killed. Pages already being parsed finish and release their trees;
+waiting scrapes resume once memory drops, or stop (partial) at their
+deadline.
+"""
+
+import gc
+import os
+from typing import Optional
+from scrape_context import ScrapeContext
+
+try:
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (None where /proc is not available)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryGuard:
+    """RSS budget checked before every page fetch"""
+    
+    def __init__(self, max_rss_mb: int = 0, poll_seconds: float = 0.5):
+        """Initialize guard
+        
+        Args:
+            max_rss_mb: Resident memory budget in MiB (0 disables the guard)
+            poll_seconds: How often to re-check memory while waiting
+        """
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.poll_seconds = poll_seconds
+        self.waits = 0
+    
+    def over_budget(self) -> bool:
+        """Check whether resident memory is above the budget"""
+        if not self.max_rss_bytes:
+            return False
+        rss = current_rss_bytes()
+        return rss is not None and rss > self.max_rss_bytes
+    
+    def wait(self, context: Optional[ScrapeContext] = None) -> bool:
+        """Block until memory is under budget
+        
+        Returns False if the context was cancelled or ran out of time while
+        waiting (the scrape should stop), True otherwise.
+        """
+        if not self.over_budget():
+            return True
+        
+        # Parse trees are full of reference cycles; collect them before waiting
+        gc.collect()
+        if not self.over_budget():
+            return True
+        
+        self.waits += 1
+        print(f"🧠 Memory above {self.max_rss_bytes // (1024 * 1024)} MiB, holding the next page fetch")
+        context = context or ScrapeContext()
+        while self.over_budget():
+            if context.should_stop():
+                return False
+            context.pause(self.poll_seconds)
+            gc.collect()
+        return True
+
+
+# Shared by every scraper in the process
+memory_guard = MemoryGuard(int(os.getenv("MAX_RSS_MB", "0")))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Money parsing
+One precompiled parser for the Rand amounts found in retailer listings,
+shared by every scraper. Amounts are parsed to integer cents so price
+comparisons and change detection are exact.
+
+Handles "R1,299.99", "R1 299.99" (space or non-breaking space), "R12,99"
+(decimal comma), "19.99 R" and plain "19.99", plus was/now/save labels in
+promotional text. Unit and multibuy prices ("R5.20 per 100g", "2 for R80")
+are skipped: they are never the item's own price. A price per kg or litre
+("R56.99 Per Kg") is only used when nothing else is, since that is how
+goods sold by weight are priced.
+"""
+
+import re
+from decimal import Decimal
+from typing import Dict, Optional, Union
+
+
+# Whole rands with optional thousands separators, then optional cents. A comma,
+# space or non-breaking space separates thousands, but only before a full
+# three-digit group that isn't a pack size, so "R1 299.99" is R1,299.99 while
+# "R12 500g" and "R12 500 ml" are R12.
+_AMOUNT = (r'(\d{1,3}(?:[, \u00a0]\d{3}(?![^\W_])(?!\s?(?i:kg|g|mg|ml|cl|l|lt|litres?|liters?)\b))+|\d+)'
+           r'(?:[.,](\d{1,2}))?(?!\d)')
+
+# Label words that say which price an amount is, tried as one alternation
+PRICE_LABELS = {
+    'was': r'was|before|usual(?:ly)?|old\s+price|regular',
+    'save': r'save|saving|you\s+save',
+    'now': r'now|only|special|promo(?:tion)?(?:\s+price)?',
+}
+
+_LABELLED_RE = re.compile(
+    r'\b(?:' + '|'.join(f'(?P<{role}>{words})' for role, words in PRICE_LABELS.items()) + r')\b'
+    r'\W{0,3}R?\s?' + _AMOUNT,
+    re.IGNORECASE
+)
+_RAND_RE = re.compile(r'R\s?' + _AMOUNT + r'|' + _AMOUNT + r'\s?R\b')
+_PLAIN_RE = re.compile(_AMOUNT)
+
+# An amount followed by one of these is a unit or multibuy price ("R5.20 per 100g", "R12/kg", "500g")
+_QUALIFIER_AFTER_RE = re.compile(
+    r'\s*(?:/|(?:per|for|kg|g|mg|ml|cl|l|lt|litres?|liters?)\b)',
+    re.IGNORECASE
+)
+# ... and so is an amount preceded by "for", with or without its R ("2 for R80")
+_QUALIFIER_BEFORE_RE = re.compile(r'\bfor\s*R?\s?$', re.IGNORECASE)
+# A price per whole kg or litre (no quantity, unlike "per 100g") is the price of goods sold by weight
+_PER_WEIGHT_RE = re.compile(r'\s*(?:/|per)\s*(?:kg|l|lt|litre|liter)\b', re.IGNORECASE)
+
+
+def _to_cents(rands: str, cents: Optional[str]) -> int:
+    """Combine the matched rand and cent digits into integer cents"""
+    whole = int(re.sub(r'[,\s]', '', rands))
+    if not cents:
+        return whole * 100
+    return whole * 100 + int(cents.ljust(2, '0'))
+
+
+def _match_cents(match) -> int:
+    """Cents for a _RAND_RE match (amount either before or after the R)"""
+    if match.group(1) is not None:
+        return _to_cents(match.group(1), match.group(2))
+    return _to_cents(match.group(3), match.group(4))
+
+
+def _is_item_price(text: str, match) -> bool:
+    """Check that an amount is not a unit or multibuy price"""
+    if _QUALIFIER_AFTER_RE.match(text, match.end()):
+        return False
+    return not _QUALIFIER_BEFORE_RE.search(text, max(0, match.start() - 10), match.start())
+
+
+def _first_rand_cents(text: str) -> Optional[int]:
+    """Cents of the first R-marked item price in text, else of the first price per kg or litre"""
+    weighed = None
+    for match in _RAND_RE.finditer(text):
+        if _is_item_price(text, match):
+            return _match_cents(match)
+        if weighed is None and _PER_WEIGHT_RE.match(text, match.end()):
+            weighed = _match_cents(match)
+    return weighed
+
+
+def parse_cents(value: Union[str, int, float, Decimal, None]) -> Optional[int]:
+    """Parse the first price in value to integer cents
+    
+    Amounts marked with an R are preferred over bare numbers, so
+    "500g R12.99" gives 1299. Numbers are taken as rands.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if not isinstance(value, str):
+        # int, float or Decimal (database values)
+        return round(float(value) * 100)
+    
+    cents = _first_rand_cents(value)
+    if cents is not None:
+        return cents
+    
+    for match in _PLAIN_RE.finditer(value):
+        if _is_item_price(value, match):
+            return _to_cents(match.group(1), match.group(2))
+    return None
+
+
+def parse_prices(text: Optional[str], struck: Optional[str] = None) -> Dict[str, Optional[int]]:
+    """Extract now/was/save prices in cents from promotional text
+    
+    Labelled amounts ("Was R20.00", "Save R5") are used as given. Otherwise
+    the first Rand item price is the current one, and a was price is only
+    taken from struck (the text of strike-through price markup). Amounts
+    alone never imply a discount. A missing saving is derived from was - now.
+    
+    Args:
+        text: Text holding the prices
+        struck: Text of strike-through elements (optional)
+    """
+    prices = {'now': None, 'was': None, 'save': None}
+    if not text:
+        return prices
+    
+    for match in _LABELLED_RE.finditer(text):
+        role = next(role for role in PRICE_LABELS if match.group(role))
+        if prices[role] is None:
+            prices[role] = _to_cents(match.group(len(PRICE_LABELS) + 1), match.group(len(PRICE_LABELS) + 2))
+    
+    if prices['was'] is None and struck:
+        prices['was'] = parse_cents(struck)
+    
+    if prices['now'] is None:
+        # The current price is the first item price that isn't the was price or the saving
+        taken = {prices['was'], prices['save']} - {None}
+        for match in _RAND_RE.finditer(text):
+            cents = _match_cents(match)
+            if cents > 0 and cents not in taken and _is_item_price(text, match):
+                prices['now'] = cents
+                break
+        else:
+            weighed = _first_rand_cents(text)
+            if weighed not in taken:
+                prices['now'] = weighed
+    
+    if prices['save'] is None and prices['was'] is not None and prices['now'] is not None:
+        if prices['was'] > prices['now']:
+            prices['save'] = prices['was'] - prices['now']
+    
+    return prices
+
+
+def cents_to_rand(cents: Optional[int]) -> Optional[float]:
+    """Convert cents to a rand amount for JSON output (None stays None)"""
+    if cents is None:
+        return None
+    return cents / 100
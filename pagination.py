@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination helpers
+Pages are walked newest first over a (timestamp, id) key. The cursor
+handed to clients is the key of the last row on the page, base64 encoded
+so clients treat it as opaque; the next page starts strictly after it,
+which costs the same at any depth (no OFFSET).
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Largest page any list endpoint returns
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+
+def page_size(limit: int) -> int:
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque cursor for the row with this (timestamp, id) key"""
+    data = json.dumps([timestamp.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(timestamp, id) key of a cursor from encode_cursor
+    
+    Raises ValueError for anything that isn't such a cursor.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def next_cursor(rows: list, limit: int, timestamp_field: str) -> Optional[str]:
+    """Cursor for the page after rows, or None if this is the last page
+    
+    rows is the query result fetched with LIMIT limit + 1; the extra row
+    only signals that another page exists and is removed here.
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    last: Dict = rows[-1]
+    return encode_cursor(last[timestamp_field], last['id'])
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Process-pool parsing for multi-page and multi-category crawls
+Fetch threads download raw listing HTML and hand it to a pool of worker
+processes that run the scrapers' extraction code, so parsing scales with
+CPU cores instead of sharing one GIL. Workers return compact product
+records (see ProductRecord.__reduce__).
+
+Usage: python parse_pool.py <store> <category> [pages] [workers]
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from categories import STORE_CATEGORIES, get_category_url
+from memory_guard import memory_guard
+from scrape_context import ScrapeContext
+
+# Worker processes for parsing (0 = one per CPU core)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+# Pages downloaded concurrently per crawl
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+# Shortest gap between a worker's fragment cache writes
+FRAGMENT_SAVE_INTERVAL = float(os.getenv("FRAGMENT_SAVE_INTERVAL", "30"))
+
+
+def parse_page(store: str, html, page_url: str, category: Optional[str] = None,
+               max_products: Optional[int] = None, fields: Optional[Tuple[str, ...]] = None) -> List:
+    """Extract the products from one page of raw HTML (runs in a worker process)
+    
+    Args:
+        store: Store key (shoprite, picknpay, woolworths)
+        html: Raw page HTML
+        page_url: URL the page was fetched from
+        category: Category key (Woolworths only)
+        max_products: Stop extracting once this many products are found (optional)
+        fields: Only extract these product fields (optional, default: all)
+    """
+    from fragment_cache import fragment_cache
+    
+    if store == "shoprite":
+        from shoprite_scraper import ShopriteScraper
+        
+        products = ShopriteScraper().extract_products(html, max_products=max_products, fields=fields)
+    elif store == "picknpay":
+        from pnp_scraper import PnPScraper
+        from selector_cache import page_template
+        
+        products = PnPScraper().parse_products(html, max_products=max_products, fields=fields,
+                                               template=page_template(page_url))
+    elif store == "woolworths":
+        from woolworths_scraper import WoolworthsScraper
+        
+        products = WoolworthsScraper(category).extract_products(html, page_url, max_products=max_products,
+                                                                fields=fields)
+    else:
+        raise ValueError(f"Unknown store '{store}'")
+    
+    # Workers outlive single pages, so their maps are written at most every FRAGMENT_SAVE_INTERVAL
+    fragment_cache.save(min_interval_seconds=FRAGMENT_SAVE_INTERVAL)
+    return products
+
+
+def page_fetcher(store: str, category: Optional[str] = None, context: Optional[ScrapeContext] = None):
+    """Return a function that downloads one page's raw HTML for store (None on failure)"""
+    if store == "shoprite":
+        from shoprite_scraper import ShopriteScraper
+        
+        scraper = ShopriteScraper()
+        fetch = scraper.fetch_page
+    elif store == "picknpay":
+        from pnp_scraper import PnPScraper
+        
+        # Plain requests - rendering pages in Chrome would serialize the crawl on the browser
+        scraper = PnPScraper()
+        fetch = scraper.fetch_page
+    elif store == "woolworths":
+        from woolworths_scraper import WoolworthsScraper
+        
+        scraper = WoolworthsScraper(category)
+        fetch = scraper.fetch_html
+    else:
+        raise ValueError(f"Unknown store '{store}'")
+    
+    if context:
+        scraper.context = context
+    return fetch
+
+
+class ParsePool:
+    """Pipeline of fetch threads feeding a process pool of page parsers"""
+    
+    def __init__(self, workers: int = PARSE_WORKERS, fetch_workers: int = FETCH_WORKERS):
+        """Initialize pool
+        
+        Args:
+            workers: Parser processes (0 = one per CPU core)
+            fetch_workers: Pages downloaded concurrently
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.fetch_workers = fetch_workers
+        self.processes = ProcessPoolExecutor(max_workers=self.workers)
+        self.threads = ThreadPoolExecutor(max_workers=fetch_workers)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Stop the fetch threads and parser processes"""
+        self.threads.shutdown(wait=True, cancel_futures=True)
+        self.processes.shutdown(wait=True, cancel_futures=True)
+    
+    def fetch_and_submit(self, fetch, store: str, page_url: str, category: Optional[str],
+                         max_products: Optional[int], fields: Optional[Tuple[str, ...]],
+                         context: Optional[ScrapeContext]):
+        """Download a page and queue it for parsing (runs in a fetch thread)"""
+        if context and context.should_stop():
+            return None
+        if not memory_guard.wait(context):
+            return None
+        html = fetch(page_url)
+        if not html:
+            return None
+        return self.processes.submit(parse_page, store, html, page_url, category, max_products, fields)
+    
+    def crawl(self, store: str, category: str, pages: Iterable[int], max_products: Optional[int] = None,
+              fields: Optional[Tuple[str, ...]] = None, context: Optional[ScrapeContext] = None) -> List:
+        """Scrape several pages of one category, parsing them in parallel
+        
+        Products come back in page order. With max_products set the result
+        is trimmed to that many products; pages are still fetched together.
+        """
+        return self.crawl_categories([(store, category, pages)], max_products, fields, context)[(store, category)]
+    
+    def crawl_categories(self, jobs: List[Tuple[str, str, Iterable[int]]], max_products: Optional[int] = None,
+                         fields: Optional[Tuple[str, ...]] = None,
+                         context: Optional[ScrapeContext] = None) -> Dict[Tuple[str, str], List]:
+        """Scrape (store, category, pages) jobs, overlapping fetching and parsing across all of them
+        
+        Returns products by (store, category), each list in page order and
+        trimmed to max_products.
+        """
+        context = context or ScrapeContext()
+        queued = []
+        for store, category, pages in jobs:
+            fetch = page_fetcher(store, category, context)
+            for page in pages:
+                page_url = get_category_url(store, category, page)
+                queued.append(((store, category), page_url, self.threads.submit(
+                    self.fetch_and_submit, fetch, store, page_url, category, max_products, fields, context
+                )))
+        
+        results = {(store, category): [] for store, category, _ in jobs}
+        for key, page_url, fetched in queued:
+            parsed = fetched.result()
+            if parsed is None:
+                print(f"⚠️  Skipped {page_url}")
+                continue
+            try:
+                results[key].extend(parsed.result())
+            except Exception as e:
+                print(f"❌ Parsing {page_url} failed: {e}")
+        
+        if max_products:
+            results = {key: products[:max_products] for key, products in results.items()}
+        return results
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    
+    store, category = sys.argv[1], sys.argv[2]
+    pages = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else PARSE_WORKERS
+    
+    if category not in STORE_CATEGORIES.get(store, {}):
+        print(f"Unknown category '{category}' for store '{store}'")
+        sys.exit(1)
+    
+    with ParsePool(workers) as pool:
+        products = pool.crawl(store, category, range(pages))
+    print(f"✓ Total products extracted: {len(products)} from {pages} page(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,27 +10,75 @@ import json
 import csv
 from datetime import datetime
 from typing import List, Dict
-import time
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from categories import PNP_CATEGORIES, get_category_url
+from fragment_cache import PageSource, fragment_cache
+from memory_guard import memory_guard
+from money import cents_to_rand, parse_cents, parse_prices
+from product_record import PnPProduct, json_default, wants
+from scrape_context import ScrapeContext
+from selector_cache import page_template, selector_cache
+
+# Selenium (and its trio/wsproto dependency tree) is imported inside the
+# methods that drive Chrome, so importing this module stays cheap for
+# processes that never launch a browser.
 
 
 class PnPScraper:
     """Scraper for Pick n Pay promotional products using Selenium"""
     
+    # Strike-through markup holding a product's was price
+    STRUCK_PRICE_SELECTOR = 's, del, strike, [class*="was-price"], [class*="old-price"], [class*="strike"]'
+    
+    # Product container selectors, tried in order until one matches
+    CONTAINER_SELECTORS = [
+        # Modern e-commerce selectors
+        '[data-testid*="product"]',
+        '[data-testid*="item"]',
+        '[data-testid*="card"]',
+        '.product-card',
+        '.product-item',
+        '.product-tile',
+        '.product-grid-item',
+        '.catalog-item',
+        '.search-result-item',
+        # Generic selectors
+        '[class*="product"]',
+        '[class*="item"]',
+        '[class*="card"]',
+        '[class*="tile"]',
+        # Data attribute selectors
+        '[data-product-id]',
+        '[data-item-id]',
+        '[data-sku]',
+        # Link selectors
+        'a[href*="/p/"]',
+        'a[href*="/product/"]',
+        'a[href*="/item/"]',
+    ]
+    
     def __init__(self):
         self.base_url = "https://www.pnp.co.za"
-        self.promotions_url = "https://www.pnp.co.za/c/pnpbase?query=:relevance:allCategories:pnpbase:isOnPromotion:On%20Promotion"
+        self.promotions_url = PNP_CATEGORIES['promotions']['url']
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Connection': 'keep-alive',
+        }
+        self.session = requests.Session()
         self.products = []
         self.driver = None
+        self.selector_cache = selector_cache
+        self.context = ScrapeContext()
+        # One timestamp per page, shared by every product extracted from it
+        self.scraped_at = None
         
     def setup_driver(self):
         """Setup Chrome driver with options"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         chrome_options.add_argument('--headless')  # Run in background
         chrome_options.add_argument('--no-sandbox')
@@ -53,89 +101,70 @@ class PnPScraper:
             self.driver.quit()
             self.driver = None
     
-    def fetch_page(self, url: str, page: int = 1) -> str:
+    def fetch_page(self, url: str) -> str:
         """Fetch HTML content from URL"""
         try:
-            # Add pagination if needed
-            if page > 1:
-                url = f"{url}&page={page}"
-            
-            print(f"Fetching page {page}...")
-            response = self.session.get(url, headers=self.headers, timeout=15)
+            print(f"Fetching: {url}")
+            response = self.session.get(url, headers=self.headers, timeout=self.context.fetch_timeout(15))
             response.raise_for_status()
-            print(f"✓ Page {page} fetched successfully ({len(response.text)} bytes)")
+            print(f"✓ Page fetched successfully ({len(response.text)} bytes)")
             return response.text
         except requests.RequestException as e:
             print(f"❌ Error fetching page: {e}")
+            if self.context.should_stop():
+                print("⏱️  Request time budget used up")
             return None
     
     def parse_price(self, price_text: str) -> Dict:
-        """Parse price from text"""
-        if not price_text:
-            return {'original': None, 'promotional': None, 'currency': 'R'}
-        
-        # Remove whitespace and newlines
-        price_text = ' '.join(price_text.split())
-        
-        # Try to find prices with R prefix
-        prices = re.findall(r'R?\s*(\d+[.,]?\d*)', price_text)
-        
-        if len(prices) >= 2:
-            # Likely has both original and promotional price
-            return {
-                'original': float(prices[0].replace(',', '.')),
-                'promotional': float(prices[1].replace(',', '.')),
-                'currency': 'R'
-            }
-        elif len(prices) == 1:
-            return {
-                'original': None,
-                'promotional': float(prices[0].replace(',', '.')),
-                'currency': 'R'
-            }
-        
-        return {'original': None, 'promotional': None, 'currency': 'R'}
+        """Parse original (was) and promotional (now) prices from text"""
+        prices = parse_prices(price_text)
+        if prices['now'] is None:
+            # Bare amounts without an R, e.g. "19.99"
+            prices['now'] = parse_cents(price_text)
+        
+        return {
+            'original': cents_to_rand(prices['was']),
+            'promotional': cents_to_rand(prices['now']),
+            'currency': 'R'
+        }
+    
+    def get_page_urls(self, max_pages: int = 1, url: str = None, category: str = 'promotions', start_page: int = 0) -> List[str]:
+        """Build listing URLs to scrape
+        
+        Args:
+            max_pages: Number of pages to scrape
+            url: Custom URL (if provided, only this page is scraped)
+            category: Listing to paginate through (see PNP_CATEGORIES)
+            start_page: First page to scrape (0-indexed, uses currentPage)
+        """
+        if url:
+            return [url]
+        return [get_category_url('picknpay', category, page) for page in range(start_page, start_page + max_pages)]
     
-    def parse_products(self, html: str) -> List[Dict]:
-        """Parse product information from HTML"""
+    def parse_products(self, html: str, max_products: int = None, fields: tuple = None,
+                       template: str = '/') -> List[Dict]:
+        """Parse product information from HTML
+        
+        Args:
+            html: Rendered page source
+            max_products: Stop extracting once this many products are found (optional)
+            fields: Only extract these product fields (optional, default: all)
+            template: Page template key for the selector cache (see page_template)
+        """
         soup = BeautifulSoup(html, 'html.parser')
         products = []
-        
-        # Try multiple selector strategies for modern e-commerce sites
-        selectors_to_try = [
-            # Modern e-commerce selectors
-            '[data-testid*="product"]',
-            '[data-testid*="item"]',
-            '[data-testid*="card"]',
-            '.product-card',
-            '.product-item',
-            '.product-tile',
-            '.product-grid-item',
-            '.catalog-item',
-            '.search-result-item',
-            # Generic selectors
-            '[class*="product"]',
-            '[class*="item"]',
-            '[class*="card"]',
-            '[class*="tile"]',
-            # Data attribute selectors
-            '[data-product-id]',
-            '[data-item-id]',
-            '[data-sku]',
-            # Link selectors
-            'a[href*="/p/"]',
-            'a[href*="/product/"]',
-            'a[href*="/item/"]',
-        ]
-        
-        product_containers = []
-        
-        for selector in selectors_to_try:
-            containers = soup.select(selector)
-            if containers:
-                product_containers = containers
-                print(f"Found {len(containers)} containers using selector: {selector}")
-                break
+        self.scraped_at = datetime.now().isoformat()
+        # Records of product containers whose markup is unchanged since the last run are reused
+        source = PageSource(html)
+        fragments = fragment_cache.category('picknpay', template)
+        reused = 0
+        
+        # The selector that matched this template last time is tried first
+        product_containers, selector = self.selector_cache.find_containers(
+            soup, 'picknpay', template, self.CONTAINER_SELECTORS
+        )
+        if product_containers:
+            print(f"Found {len(product_containers)} containers using selector: {selector}")
         
         if not product_containers:
             print("⚠️  No product containers found with any selector")
@@ -155,8 +184,20 @@ class PnPScraper:
         print(f"Processing {len(product_containers)} potential product containers")
         
         for idx, container in enumerate(product_containers):
+            if max_products and len(products) >= max_products:
+                print(f"✓ Reached max_products limit ({max_products}), skipping remaining containers")
+                break
+            
+            if self.context.should_stop():
+                print(f"⏱️  Time budget used up after {len(products)} products")
+                break
+            
             try:
-                product = self.extract_product_data(container)
+                product, from_cache = fragments.extract(
+                    source, container, fields, PnPProduct, self.scraped_at,
+                    lambda: self.extract_product_data(container, fields)
+                )
+                reused += from_cache
                 if product and product.get('name'):
                     products.append(product)
                     print(f"✓ Added product: {product.get('name')}")
@@ -166,28 +207,24 @@ class PnPScraper:
                 print(f"Error parsing product {idx}: {e}")
                 continue
         
+        if reused:
+            print(f"♻️  Reused {reused}/{len(products)} unchanged products")
+        
+        # Products only hold plain strings, so the page tree can be freed now
+        soup.decompose()
         return products
     
-    def extract_product_data(self, container) -> Dict:
-        """Extract product data from container element"""
-        product = {
-            'name': None,
-            'brand': None,
-            'price': None,
-            'original_price': None,
-            'promotional_price': None,
-            'discount': None,
-            'image_url': None,
-            'product_url': None,
-            'product_id': None,
-            'description': None,
-            'in_stock': True,
-            'scraped_at': datetime.now().isoformat()
-        }
+    def extract_product_data(self, container, fields: tuple = None) -> PnPProduct:
+        """Extract product data from container element
+        
+        Fields not listed in fields are skipped and left at their defaults.
+        The name is always extracted since products without one are dropped.
+        """
+        product = PnPProduct(scraped_at=self.scraped_at or datetime.now().isoformat())
         
         # Extract from data attributes (PnP specific)
         product['name'] = container.get('data-cnstrc-item-name')
-        product['price'] = container.get('data-cnstrc-item-price')
+        product['price'] = cents_to_rand(parse_cents(container.get('data-cnstrc-item-price')))
         product['product_id'] = container.get('data-cnstrc-item-id')
         
         # If data attributes not found, try traditional selectors
@@ -221,172 +258,240 @@ class PnPScraper:
                     break
         
         # Extract brand
-        brand_elem = container.find(class_=re.compile(r'brand', re.I))
-        if brand_elem:
-            product['brand'] = brand_elem.get_text(strip=True)
-        
-        # Extract prices - look for price patterns in text
-        text = container.get_text()
-        
-        # Look for price patterns
-        price_patterns = [
-            r'R\s*(\d+(?:\.\d{2})?)',  # R 19.99
-            r'(\d+(?:\.\d{2})?)\s*R',  # 19.99 R
-            r'R\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # R 1,234.56
-        ]
-        
-        prices = []
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                try:
-                    price = float(match.replace(',', ''))
-                    if price > 0:
-                        prices.append(price)
-                except ValueError:
-                    continue
+        if wants(fields, 'brand'):
+            brand_elem = container.find(class_=re.compile(r'brand', re.I))
+            if brand_elem:
+                product['brand'] = brand_elem.get_text(strip=True)
         
-        if prices:
-            # Sort prices to get the structure
-            prices.sort()
-            if len(prices) == 1:
-                product['promotional_price'] = prices[0]
-            elif len(prices) == 2:
-                product['original_price'] = prices[1]
-                product['promotional_price'] = prices[0]
-                if prices[1] > prices[0]:
-                    discount = ((prices[1] - prices[0]) / prices[1]) * 100
-                    product['discount'] = f"{discount:.1f}%"
-        
-        # Also try the old method as fallback
-        price_container = container.find(class_=re.compile(r'price', re.I))
-        if price_container and not prices:
-            price_text = price_container.get_text()
-            price_data = self.parse_price(price_text)
-            product['original_price'] = price_data['original']
-            product['promotional_price'] = price_data['promotional']
-            
-            # Calculate discount
-            if price_data['original'] and price_data['promotional']:
-                discount_percent = ((price_data['original'] - price_data['promotional']) / price_data['original']) * 100
-                product['discount'] = f"{discount_percent:.1f}%"
+        if wants(fields, 'original_price', 'promotional_price', 'discount'):
+            self.extract_prices(container, product)
         
         # Extract image
-        img_elem = container.find('img')
+        img_elem = container.find('img') if wants(fields, 'image_url') else None
         if img_elem:
             product['image_url'] = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-lazy-src')
             if product['image_url'] and product['image_url'].startswith('/'):
                 product['image_url'] = self.base_url + product['image_url']
         
         # Extract product URL
-        link_elem = container.find('a', href=True)
+        link_elem = container.find('a', href=True) if wants(fields, 'product_url') else None
         if link_elem:
             product['product_url'] = link_elem['href']
             if product['product_url'].startswith('/'):
                 product['product_url'] = self.base_url + product['product_url']
         
-        # Extract product ID
-        product['product_id'] = (
-            container.get('data-product-id') or
-            container.get('data-id') or
-            container.get('id')
-        )
+        # Other id attributes only stand in for a missing Constructor id; the element's own
+        # id is layout-specific, so it never becomes the product's identity
+        if not product['product_id']:
+            product['product_id'] = container.get('data-product-id') or container.get('data-id')
         
         # Extract description
-        desc_elem = container.find(class_=re.compile(r'description|desc', re.I))
+        desc_elem = container.find(class_=re.compile(r'description|desc', re.I)) if wants(fields, 'description') else None
         if desc_elem:
             product['description'] = desc_elem.get_text(strip=True)
         
         # Check stock status
-        stock_elem = container.find(class_=re.compile(r'stock|availability', re.I))
+        stock_elem = container.find(class_=re.compile(r'stock|availability', re.I)) if wants(fields, 'in_stock') else None
         if stock_elem:
             stock_text = stock_elem.get_text().lower()
             product['in_stock'] = 'out' not in stock_text and 'unavailable' not in stock_text
         
         return product
     
-    def scrape(self, max_pages: int = 1, url: str = None) -> List[Dict]:
-        """Main scraping method using Selenium"""
-        print("=" * 80)
-        print("Pick n Pay Promotions Scraper (Selenium)")
-        print("=" * 80)
+    def extract_prices(self, container, product: Dict):
+        """Fill original/promotional price and discount of product from container text"""
+        # Extract was/now prices from the container text in one pass; only labels
+        # or strike-through markup make an amount the was price
+        struck = ' '.join(elem.get_text(' ') for elem in container.select(self.STRUCK_PRICE_SELECTOR))
+        prices = parse_prices(container.get_text(), struck)
+        
+        if prices['now'] is not None:
+            product['promotional_price'] = cents_to_rand(prices['now'])
+            if prices['was'] is not None and prices['was'] > prices['now']:
+                product['original_price'] = cents_to_rand(prices['was'])
+                discount = (prices['was'] - prices['now']) * 100 / prices['was']
+                product['discount'] = f"{discount:.1f}%"
         
-        target_url = url or self.promotions_url
-        print(f"\nTarget URL: {target_url}")
-        print(f"Max pages to scrape: {max_pages}\n")
+        # Also try the old method as fallback
+        price_container = container.find(class_=re.compile(r'price', re.I))
+        if price_container and prices['now'] is None:
+            price_text = price_container.get_text()
+            price_data = self.parse_price(price_text)
+            product['original_price'] = price_data['original']
+            product['promotional_price'] = price_data['promotional']
+            
+            # Calculate discount
+            if price_data['original'] and price_data['promotional']:
+                discount_percent = ((price_data['original'] - price_data['promotional']) / price_data['original']) * 100
+                product['discount'] = f"{discount_percent:.1f}%"
+    
+    def iter_pages(self, max_pages: int = 1, url: str = None, category: str = 'promotions',
+                   start_page: int = 0, max_products: int = None, fields: tuple = None,
+                   context: ScrapeContext = None):
+        """Yield each page's products as soon as the page is extracted
+        
+        Takes the same arguments as scrape. Only one page's products are
+        held at a time, and self.products is not set. Chrome is closed when
+        the generator finishes or is closed.
+        """
+        if context:
+            self.context = context
+        
+        page_urls = self.get_page_urls(max_pages, url, category, start_page)
+        print(f"\nTarget URL: {page_urls[0]}")
+        print(f"Max pages to scrape: {len(page_urls)}\n")
+        
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
         
         # Setup Chrome driver
         if not self.setup_driver():
             print("❌ Failed to setup Chrome driver. Falling back to requests method.")
-            return self.scrape_with_requests(max_pages)
+            yield from self.iter_pages_with_requests(page_urls, max_products, fields)
+            return
         
         try:
-            all_products = []
+            found = 0
             
-            for page in range(1, max_pages + 1):
+            for page, page_url in enumerate(page_urls, 1):
+                if self.context.should_stop():
+                    print("⏱️  Time budget used up, returning products gathered so far")
+                    break
+                
+                if not memory_guard.wait(self.context):
+                    print("⏱️  Time budget used up waiting for memory, returning products gathered so far")
+                    break
+                
                 print(f"🔄 Scraping page {page}...")
                 
                 # Navigate to the page
-                self.driver.get(target_url)
+                try:
+                    self.driver.set_page_load_timeout(self.context.fetch_timeout(60))
+                    self.driver.get(page_url)
+                except TimeoutException:
+                    print(f"⚠️  Page {page} did not finish loading")
+                    if self.context.should_stop():
+                        break
+                    continue
                 
                 # Wait for page to load
                 try:
                     # Wait for any product elements to appear
-                    WebDriverWait(self.driver, 10).until(
+                    WebDriverWait(self.driver, self.context.fetch_timeout(10)).until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid*='product'], .product, [class*='product'], [class*='item']"))
                     )
                 except TimeoutException:
                     print(f"⚠️  No product elements found on page {page}")
+                    if self.context.should_stop():
+                        break
                     continue
                 
                 # Get the page source after JavaScript execution
                 html = self.driver.page_source
                 
                 # Parse products from the rendered HTML
-                products = self.parse_products(html)
+                remaining = max_products - found if max_products else None
+                products = self.parse_products(html, max_products=remaining, fields=fields,
+                                               template=page_template(page_url))
                 print(f"✓ Extracted {len(products)} products from page {page}")
+                found += len(products)
+                
+                yield products
                 
-                all_products.extend(products)
+                # Check if we should stop early
+                if max_products and found >= max_products:
+                    print(f"\n✓ Reached max_products limit ({max_products})")
+                    break
                 
                 # Be respectful - add delay between requests
-                if page < max_pages:
-                    time.sleep(3)
-            
-            self.products = all_products
-            return all_products
+                if page < len(page_urls):
+                    self.context.pause(3)
             
         finally:
             self.close_driver()
+            # One write per scrape rather than per page (maps are per page template)
+            fragment_cache.save()
     
-    def scrape_with_requests(self, max_pages: int = 1) -> List[Dict]:
-        """Fallback scraping method using requests"""
-        print("🔄 Using fallback requests method...")
+    def iter_products(self, max_pages: int = 1, url: str = None, category: str = 'promotions',
+                      start_page: int = 0, max_products: int = None, fields: tuple = None,
+                      context: ScrapeContext = None):
+        """Yield products one at a time across pages (see iter_pages)"""
+        for products in self.iter_pages(max_pages, url, category, start_page, max_products, fields, context):
+            yield from products
+    
+    def scrape(self, max_pages: int = 1, url: str = None, category: str = 'promotions',
+               start_page: int = 0, max_products: int = None, fields: tuple = None,
+               context: ScrapeContext = None) -> List[Dict]:
+        """Main scraping method using Selenium
+        
+        Args:
+            max_pages: Number of pages to scrape (default: 1)
+            url: Custom URL (if provided, only this page is scraped)
+            category: Listing to paginate through (see PNP_CATEGORIES, default: promotions)
+            start_page: First page to scrape (0-indexed)
+            max_products: Limit total products, extraction stops once reached (optional)
+            fields: Only extract these product fields (optional, default: all)
+            context: Time budget for the whole scrape (optional, sets context.partial when cut short)
+        """
+        print("=" * 80)
+        print("Pick n Pay Promotions Scraper (Selenium)")
+        print("=" * 80)
         
-        all_products = []
+        self.products = list(self.iter_products(max_pages, url, category, start_page, max_products, fields, context))
+        return self.products
+    
+    def iter_pages_with_requests(self, page_urls: List[str] = None, max_products: int = None, fields: tuple = None):
+        """Yield each page's products using plain requests instead of Chrome"""
+        print("🔄 Using fallback requests method...")
         
-        for page in range(1, max_pages + 1):
-            html = self.fetch_page(self.promotions_url, page)
-            
-            if not html:
-                print(f"Failed to fetch page {page}, stopping...")
-                break
-            
-            products = self.parse_products(html)
-            print(f"✓ Extracted {len(products)} products from page {page}\n")
-            
-            all_products.extend(products)
-            
-            # Be respectful - add delay between requests
-            if page < max_pages:
-                time.sleep(2)
+        page_urls = page_urls or self.get_page_urls()
+        found = 0
         
-        self.products = all_products
-        return all_products
+        try:
+            for page, page_url in enumerate(page_urls, 1):
+                if self.context.should_stop():
+                    print("⏱️  Time budget used up, returning products gathered so far")
+                    break
+                
+                if not memory_guard.wait(self.context):
+                    print("⏱️  Time budget used up waiting for memory, returning products gathered so far")
+                    break
+                
+                html = self.fetch_page(page_url)
+                
+                if not html:
+                    print(f"Failed to fetch page {page}, stopping...")
+                    break
+                
+                remaining = max_products - found if max_products else None
+                products = self.parse_products(html, max_products=remaining, fields=fields,
+                                               template=page_template(page_url))
+                print(f"✓ Extracted {len(products)} products from page {page}\n")
+                found += len(products)
+                
+                yield products
+                
+                if max_products and found >= max_products:
+                    break
+                
+                # Be respectful - add delay between requests
+                if page < len(page_urls):
+                    self.context.pause(2)
+        finally:
+            fragment_cache.save()
+    
+    def scrape_with_requests(self, page_urls: List[str] = None, max_products: int = None, fields: tuple = None) -> List[Dict]:
+        """Fallback scraping method using requests"""
+        self.products = [product for products in self.iter_pages_with_requests(page_urls, max_products, fields)
+                         for product in products]
+        return self.products
     
     def save_json(self, filename: str = 'pnp_promotions.json'):
         """Save products to JSON file"""
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.products, f, indent=2, ensure_ascii=False)
+            json.dump(self.products, f, indent=2, ensure_ascii=False, default=json_default)
         print(f"✓ Saved {len(self.products)} products to {filename}")
     
     def save_csv(self, filename: str = 'pnp_promotions.csv'):
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Product identity
+Deterministic product ids for the products table, the same in every
+process and on every run: the store's own product code, else a digest of
+the normalized product URL, else a digest of the normalized name and pack
+size. (Python's hash() is salted per process, so ids built from it changed
+on every restart.)
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Record fields holding the store's own product code
+CODE_FIELDS = ('product_code', 'product_id')
+
+# Prefix of the ids the old hash()-based fallback produced
+LEGACY_PREFIX = 'fallback_'
+
+# Pack sizes like "400g", "1,5 L", "6 x 330ml", "2 litres"
+SIZE_RE = re.compile(
+    r'\b(?:(\d+)\s*x\s*)?(\d+(?:[.,]\d+)?)\s*'
+    r'(kg|g|mg|ml|l|litres?|liters?|lt|cl|pack|pk|s)\b',
+    re.IGNORECASE
+)
+UNIT_ALIASES = {'litre': 'l', 'litres': 'l', 'liter': 'l', 'liters': 'l', 'lt': 'l', 'pack': 'pk', 's': 'pk'}
+NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()[:24]
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """Host and path of a product URL, lowercased, without query, fragment or trailing slash"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    path = parts.path.rstrip('/').lower()
+    return f"{parts.netloc.lower().removeprefix('www.')}{path}"
+
+
+def split_size(name: str) -> Tuple[str, str]:
+    """Split a product name into (normalized name, normalized pack size)"""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode().lower()
+    
+    size = ''
+    # The size is usually last in the name ("Fresh Milk 2L")
+    matches = list(SIZE_RE.finditer(text))
+    if matches:
+        match = matches[-1]
+        count, amount, unit = match.groups()
+        amount = amount.replace(',', '.')
+        if '.' in amount:
+            amount = amount.rstrip('0').rstrip('.')
+        unit = UNIT_ALIASES.get(unit.lower(), unit.lower())
+        size = f"{count}x{amount}{unit}" if count else f"{amount}{unit}"
+        text = text[:match.start()] + ' ' + text[match.end():]
+    
+    return NON_WORD_RE.sub(' ', text).strip(), size
+
+
+def name_identity(store: str, name: Optional[str]) -> Optional[str]:
+    """Id from a digest of the normalized name and pack size (None without a name)"""
+    normalized, size = split_size(name or '')
+    if not normalized:
+        return None
+    return 'name_' + _digest(f"{store}|{normalized}|{size}")
+
+
+def url_identity(url: Optional[str]) -> Optional[str]:
+    """Id from a digest of the normalized product URL (None without a usable URL)"""
+    normalized = normalize_url(url)
+    if not normalized:
+        return None
+    return 'url_' + _digest(normalized)
+
+
+def product_identity(store: str, product: Dict) -> Optional[str]:
+    """Stable product id: store product code, else URL digest, else name+size digest"""
+    candidates = identity_candidates(store, product)
+    return candidates[0] if candidates else None
+
+
+def identity_candidates(store: str, product: Dict) -> List[str]:
+    """Ids a product may already be stored under, best first
+    
+    The first entry is the product's identity. Later entries are the weaker
+    ids it would have had with less data, so rows stored under them (for
+    example by the dedup job, which only knows names) can be adopted.
+    """
+    candidates = []
+    for field in CODE_FIELDS:
+        code = product.get(field)
+        if code and str(code).strip():
+            candidates.append(str(code).strip())
+            break
+    for identity in (url_identity(product.get('product_url')), name_identity(store, product.get('name'))):
+        if identity and identity not in candidates:
+            candidates.append(identity)
+    return candidates
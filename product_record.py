@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Product records
+Field names produced by each scraper, the compact slotted record types the
+scrapers build, and helpers for the `fields=` projection supported by the
+API. Kept free of scraper imports.
+"""
+
+import operator
+import sys
+from typing import Dict, Iterable, Optional, Tuple
+
+
+SHOPRITE_FIELDS = (
+    'name', 'brand', 'price', 'original_price', 'special_price', 'savings',
+    'image_url', 'product_url', 'product_code', 'category', 'in_stock',
+    'on_special', 'scraped_at'
+)
+
+PNP_FIELDS = (
+    'name', 'brand', 'price', 'original_price', 'promotional_price', 'discount',
+    'image_url', 'product_url', 'product_id', 'description', 'in_stock',
+    'scraped_at'
+)
+
+WOOLWORTHS_FIELDS = (
+    'name', 'price', 'original_price', 'special_price', 'savings', 'image_url',
+    'product_url', 'product_code', 'category', 'in_stock', 'on_special',
+    'scraped_at'
+)
+
+# Product fields by store key, as used in API routes
+STORE_FIELDS = {
+    'shoprite': SHOPRITE_FIELDS,
+    'picknpay': PNP_FIELDS,
+    'woolworths': WOOLWORTHS_FIELDS
+}
+
+
+class ProductRecord:
+    """Slotted product record that still reads and writes like the old product dicts
+    
+    Subclasses list their fields in __slots__ and FIELDS. Records support
+    product['name'], product.get('name'), keys() and dict(product), so code
+    written against dict products keeps working, while using a fraction of
+    the memory of a dict per product.
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    DEFAULTS: Dict = {}
+    # Fields repeated across a whole page, stored as one shared string object
+    INTERNED: Tuple[str, ...] = ('category',)
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._values = operator.attrgetter(*cls.FIELDS)
+    
+    def __init__(self, **values):
+        for name in self.FIELDS:
+            setattr(self, name, self.DEFAULTS.get(name))
+        for name, value in values.items():
+            self[name] = value
+    
+    def __getitem__(self, name: str):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+    
+    def __setitem__(self, name: str, value):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        if isinstance(value, str):
+            if type(value) is not str:
+                # A NavigableString would keep its whole parse tree alive
+                value = str(value)
+            if name in self.INTERNED:
+                value = sys.intern(value)
+        setattr(self, name, value)
+    
+    def __contains__(self, name) -> bool:
+        return name in self.FIELDS
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ProductRecord, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+    
+    def get(self, name: str, default=None):
+        if name not in self.FIELDS:
+            return default
+        return getattr(self, name)
+    
+    def keys(self):
+        return self.to_dict().keys()
+    
+    def values(self):
+        return list(self._values(self))
+    
+    def items(self):
+        return self.to_dict().items()
+    
+    def __reduce__(self):
+        # Pickled as the bare value tuple, e.g. when returned from parse worker processes
+        return (_rebuild_record, (type(self), self._values(self)))
+    
+    @classmethod
+    def from_values(cls, values: Iterable) -> 'ProductRecord':
+        """Build a record from values in FIELDS order"""
+        record = cls.__new__(cls)
+        for name, value in zip(cls.FIELDS, values):
+            record[name] = value
+        return record
+    
+    def to_dict(self) -> Dict:
+        """Plain dict copy of the record"""
+        return dict(zip(self.FIELDS, self._values(self)))
+
+
+def _rebuild_record(cls, values: Tuple) -> ProductRecord:
+    """Unpickle a record from the value tuple written by ProductRecord.__reduce__"""
+    return cls.from_values(values)
+
+
+class ShopriteProduct(ProductRecord):
+    __slots__ = SHOPRITE_FIELDS
+    FIELDS = SHOPRITE_FIELDS
+    DEFAULTS = {'in_stock': True, 'on_special': False}
+
+
+class PnPProduct(ProductRecord):
+    __slots__ = PNP_FIELDS
+    FIELDS = PNP_FIELDS
+    DEFAULTS = {'in_stock': True}
+
+
+class WoolworthsProduct(ProductRecord):
+    __slots__ = WOOLWORTHS_FIELDS
+    FIELDS = WOOLWORTHS_FIELDS
+    DEFAULTS = {'in_stock': True, 'on_special': False}
+
+
+def json_default(value):
+    """json.dump(s) default= hook that serializes product records"""
+    if isinstance(value, ProductRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def parse_fields(fields: Optional[str], store: str) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated fields parameter
+    
+    Returns None when all fields are wanted, otherwise the requested fields
+    in request order without duplicates. Raises ValueError for unknown fields.
+    """
+    if not fields:
+        return None
+    
+    requested = []
+    for field in fields.split(','):
+        field = field.strip()
+        if field and field not in requested:
+            requested.append(field)
+    
+    if not requested:
+        return None
+    
+    available = STORE_FIELDS[store]
+    unknown = [field for field in requested if field not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)}. Available: {', '.join(available)}")
+    
+    return tuple(requested)
+
+
+def wants(fields: Optional[Iterable[str]], *names: str) -> bool:
+    """Check whether any of names is requested (fields=None means everything)"""
+    if fields is None:
+        return True
+    return any(name in fields for name in names)
+
+
+def project_product(product: Dict, fields: Optional[Tuple[str, ...]]) -> Dict:
+    """Keep only the requested fields of a product"""
+    if fields is None:
+        return product
+    return {field: product.get(field) for field in fields}
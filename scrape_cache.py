@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+In-memory scrape cache for the Simple Grocery API
+Caches scraped listing pages per (store, category, page) and tracks which
+categories are requested most so they can be warmed up after a restart
+
+Entries scraped with a max_products limit only hold the first N products of
+the page; they serve requests for up to N products and are replaced by a
+complete page as soon as one is scraped. Likewise, entries scraped for a
+subset of product fields only serve requests for fields within that subset.
+Partial results (a scrape cut short by its time budget) and empty results
+(almost always a failed fetch) are returned to the callers waiting on them
+but never stored. When every caller waiting on a
+scrape has gone away, the scrape's on_abandoned callback is invoked so it
+can stop early.
+
+The cache holds at most max_entries pages (with their rendered response
+bodies); expired entries are swept on every store and the least recently
+used ones are evicted beyond the cap.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# fill() returns (products, url, partial)
+FillResult = Tuple[List[Dict], str, bool]
+
+
+class ScrapeCache:
+    """TTL cache of scraped pages with single-flight filling and access counting"""
+    
+    def __init__(self, ttl_seconds: int = 3600, access_counts_file: str = None, max_entries: int = 200):
+        """Initialize cache
+        
+        Args:
+            ttl_seconds: How long a scraped page is served
+            access_counts_file: JSON file the access counts are persisted to (optional)
+            max_entries: Most pages kept; the least recently used are evicted beyond this
+        """
+        self.ttl_seconds = ttl_seconds
+        self.access_counts_file = access_counts_file
+        self.max_entries = max_entries
+        # Least recently used first
+        self.entries: "OrderedDict[Tuple[str, str, int], Dict]" = OrderedDict()
+        self.inflight: Dict[Tuple[str, str, int], Dict] = {}
+        self.access_counts = Counter()
+    
+    @staticmethod
+    def covers(limit: Optional[int], max_products: Optional[int],
+               scraped_fields: Optional[Tuple[str, ...]] = None,
+               fields: Optional[Tuple[str, ...]] = None) -> bool:
+        """Check whether a page scraped with limit and scraped_fields can answer
+        a request for max_products and fields (None means all fields)"""
+        if scraped_fields is not None and (fields is None or not set(fields) <= set(scraped_fields)):
+            return False
+        if limit is None:
+            return True
+        return max_products is not None and max_products <= limit
+    
+    def get(self, key: Tuple[str, str, int], max_products: Optional[int] = None,
+            fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict]:
+        """Return a fresh cache entry for key covering max_products and fields, or None"""
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        
+        if time.time() - entry['cached_at'] > self.ttl_seconds:
+            del self.entries[key]
+            return None
+        
+        if not self.covers(entry['max_products'], max_products, entry['fields'], fields):
+            return None
+        
+        self.entries.move_to_end(key)
+        return entry
+    
+    def set(self, key: Tuple[str, str, int], products: List[Dict], url: str,
+            max_products: Optional[int] = None, fields: Optional[Tuple[str, ...]] = None,
+            partial: bool = False) -> Dict:
+        """Store scraped products for key and return the new entry
+        
+        A fresh entry holding more products or fields is kept over a smaller
+        one. Partial entries are returned without being stored; an empty
+        result counts as partial, so a failed fetch is retried on the next
+        request instead of being served for the whole TTL.
+        """
+        if not products:
+            partial = True
+        
+        entry = {
+            'products': products,
+            'url': url,
+            'max_products': max_products,
+            'fields': fields,
+            'partial': partial,
+            'cached_at': time.time()
+        }
+        if partial:
+            return entry
+        
+        existing = self.entries.get(key)
+        if (existing is None or time.time() - existing['cached_at'] > self.ttl_seconds or
+                self.covers(max_products, existing['max_products'], fields, existing['fields'])):
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.evict()
+        return entry
+    
+    def evict(self):
+        """Drop expired entries, then the least recently used ones beyond max_entries"""
+        cutoff = time.time() - self.ttl_seconds
+        for key in [key for key, entry in self.entries.items() if entry['cached_at'] < cutoff]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    async def get_or_fill(self, key: Tuple[str, str, int],
+                          fill: Callable[[], Awaitable[FillResult]],
+                          max_products: Optional[int] = None,
+                          fields: Optional[Tuple[str, ...]] = None,
+                          on_abandoned: Optional[Callable[[], None]] = None) -> Dict:
+        """Return the cached entry for key, scraping it with fill() on a miss
+        
+        Concurrent callers for the same key share one in-flight scrape instead
+        of each starting their own, as long as that scrape fetches enough
+        products and fields for them. Cancelling a caller leaves the shared
+        scrape running; on_abandoned (given by the caller that started it) is
+        called once no caller is left waiting for it.
+        """
+        entry = self.get(key, max_products, fields)
+        if entry:
+            return entry
+        
+        inflight = self.inflight.get(key)
+        if not inflight or not self.covers(inflight['max_products'], max_products, inflight['fields'], fields):
+            inflight = {
+                'task': asyncio.ensure_future(self._fill(key, fill, max_products, fields)),
+                'max_products': max_products,
+                'fields': fields,
+                'waiters': 0,
+                'on_abandoned': on_abandoned
+            }
+            self.inflight[key] = inflight
+        
+        inflight['waiters'] += 1
+        try:
+            return await asyncio.shield(inflight['task'])
+        finally:
+            inflight['waiters'] -= 1
+            if inflight['waiters'] == 0 and not inflight['task'].done() and inflight['on_abandoned']:
+                inflight['on_abandoned']()
+    
+    async def _fill(self, key: Tuple[str, str, int],
+                    fill: Callable[[], Awaitable[FillResult]],
+                    max_products: Optional[int], fields: Optional[Tuple[str, ...]]) -> Dict:
+        """Run fill() and store its result, clearing the in-flight marker"""
+        try:
+            products, url, partial = await fill()
+            return self.set(key, products, url, max_products, fields, partial)
+        finally:
+            inflight = self.inflight.get(key)
+            if inflight and inflight['task'] is asyncio.current_task():
+                del self.inflight[key]
+    
+    def record_access(self, store: str, category: str):
+        """Count a request for store/category"""
+        self.access_counts[f"{store}/{category}"] += 1
+    
+    def hot_categories(self, registry: Dict[str, List[str]], limit: int) -> List[Tuple[str, str]]:
+        """Pick the most requested categories from the registry
+        
+        Args:
+            registry: Mapping of store -> category keys, in default priority order
+            limit: Maximum number of (store, category) pairs to return
+        """
+        candidates = []
+        for store_index, (store, categories) in enumerate(registry.items()):
+            for position, category in enumerate(categories):
+                count = self.access_counts.get(f"{store}/{category}", 0)
+                # Registry order breaks ties, so a fresh install warms the first
+                # category of each store before the rest
+                candidates.append((-count, position, store_index, store, category))
+        
+        candidates.sort()
+        return [(store, category) for _, _, _, store, category in candidates[:limit]]
+    
+    def load_access_counts(self, decay: float = 0.5):
+        """Load access counts saved by a previous process
+        
+        Counts are multiplied by decay on load so recent traffic outweighs
+        traffic from several restarts ago.
+        """
+        if not self.access_counts_file or not os.path.exists(self.access_counts_file):
+            return
+        
+        try:
+            with open(self.access_counts_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load access counts: {e}")
+            return
+        
+        for key, count in saved.items():
+            decayed = int(count * decay)
+            if decayed > 0:
+                self.access_counts[key] += decayed
+    
+    def save_access_counts(self):
+        """Persist access counts so the next process can warm the same categories"""
+        if not self.access_counts_file:
+            return
+        
+        try:
+            with open(self.access_counts_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(self.access_counts), f, indent=2)
+        except OSError as e:
+            print(f"⚠️  Could not save access counts: {e}")
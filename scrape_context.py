@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Scrape context
+Carries a request's time budget and cancellation flag through the scraper
+call chain. Scrapers size their fetch timeouts from the remaining budget
+and check the context between pages and containers, returning what they
+have gathered so far (marked partial) once the budget is used up or the
+scrape is cancelled.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class ScrapeContext:
+    """Deadline and cancellation token shared by every fetch and parse step of one scrape"""
+    
+    def __init__(self, timeout_ms: Optional[int] = None):
+        """Initialize context
+        
+        Args:
+            timeout_ms: Time budget in milliseconds (optional, default: no deadline)
+        """
+        self.deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        self.partial = False
+        # Set from the event loop, read from the scraper's worker thread
+        self.cancelled = threading.Event()
+    
+    def cancel(self):
+        """Ask the scrape to stop at its next check"""
+        self.cancelled.set()
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None without a deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def fetch_timeout(self, default: float) -> float:
+        """Timeout for the next network call: default, capped by the remaining budget"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        # requests and Selenium reject a zero timeout
+        return max(0.001, min(default, remaining))
+    
+    def pause(self, seconds: float):
+        """Sleep between pages without overrunning the deadline"""
+        remaining = self.remaining()
+        time.sleep(seconds if remaining is None else min(seconds, remaining))
+    
+    def should_stop(self) -> bool:
+        """Check whether the scrape has to stop now
+        
+        Returns True once the scrape is cancelled or the deadline has passed
+        and marks the result as partial, so call it before starting work
+        rather than after.
+        """
+        if self.cancelled.is_set():
+            self.partial = True
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.partial = True
+            return True
+        return False
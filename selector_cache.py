@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Selector strategy cache
+Remembers which container selector found the products on each store's page
+template, so the next scrape of that template runs one soup.select instead
+of walking the tree once per candidate selector. Discovery over the full
+selector list only runs when the learned selector finds nothing, and the
+candidates ranked above a learned fallback are tried again every few hours
+so a loose selector learned once doesn't stick for good. Learned strategies
+are persisted so they survive restarts.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+def page_template(url: Optional[str]) -> str:
+    """Template key for a listing URL: its first path segment ("/c", "/cat" or "/")"""
+    if not url:
+        return '/'
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    return '/' + segments[0] if segments else '/'
+
+
+class SelectorCache:
+    """Learned container selector per (store, page template), shared by all scraper instances"""
+    
+    def __init__(self, path: Optional[str] = "selector_cache.json", recheck_seconds: int = 6 * 3600):
+        """Initialize cache
+        
+        Args:
+            path: JSON file the learned strategies are persisted to (None keeps them in memory)
+            recheck_seconds: How often candidates ranked above a learned selector are tried again
+        """
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self.strategies: Dict[str, Dict] = {}
+        # Scrapers for different stores run in parallel worker threads
+        self.lock = threading.Lock()
+        self.loaded = False
+    
+    def load(self):
+        """Load strategies learned by a previous process (once)"""
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.strategies = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not load selector cache: {e}")
+    
+    def save(self):
+        """Persist learned strategies and their hit counts"""
+        if not self.path:
+            return
+        
+        with self.lock:
+            strategies = json.dumps(self.strategies, indent=2)
+        
+        directory = os.path.dirname(self.path) or '.'
+        temp_path = None
+        try:
+            # Write to a temporary file of our own first so a crash never leaves a half-written
+            # cache and concurrent saves never write into each other's file
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(strategies)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save selector cache: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def recheck_due(self, strategy: Dict) -> bool:
+        """Whether the candidates ranked above the learned selector should be tried again"""
+        checked_at = strategy.get('checked_at') or strategy['learned_at']
+        return datetime.fromisoformat(checked_at) < datetime.now() - timedelta(seconds=self.recheck_seconds)
+    
+    def find_containers(self, soup, store: str, template: str, selectors: List[str],
+                        min_count: int = 1) -> Tuple[list, Optional[str]]:
+        """Select product containers, trying the learned selector first
+        
+        Args:
+            soup: Parsed page
+            store: Store key (shoprite, picknpay, woolworths)
+            template: Page template key (see page_template)
+            selectors: Candidate selectors in discovery order
+            min_count: Fewest matches that count as finding the product list
+        
+        Returns (containers, selector). Containers is empty and selector None
+        when no candidate matches, so the caller can use its own fallback.
+        """
+        self.load()
+        key = f"{store}:{template}"
+        with self.lock:
+            strategy = self.strategies.get(key)
+            learned = strategy['selector'] if strategy else None
+        
+        if learned in selectors:
+            with self.lock:
+                recheck = self.recheck_due(strategy)
+            if recheck:
+                # A higher-priority selector may match again (the learned one may be a loose fallback)
+                for selector in selectors[:selectors.index(learned)]:
+                    containers = soup.select(selector)
+                    if len(containers) >= min_count:
+                        self.learn(key, selector)
+                        return containers, selector
+                with self.lock:
+                    strategy['checked_at'] = datetime.now().isoformat()
+                self.save()
+            
+            containers = soup.select(learned)
+            if len(containers) >= min_count:
+                with self.lock:
+                    strategy['hits'] += 1
+                return containers, learned
+        
+        # Discovery: the learned selector is missing or stopped matching
+        for selector in selectors:
+            if selector == learned:
+                continue
+            containers = soup.select(selector)
+            if len(containers) >= min_count:
+                self.learn(key, selector)
+                return containers, selector
+        
+        with self.lock:
+            if strategy:
+                strategy['misses'] += 1
+        return [], None
+    
+    def learn(self, key: str, selector: str):
+        """Record selector as the strategy for key and persist the change"""
+        with self.lock:
+            previous = self.strategies.get(key)
+            self.strategies[key] = {
+                'selector': selector,
+                'hits': 0,
+                'misses': 0,
+                'discoveries': previous['discoveries'] + 1 if previous else 1,
+                'learned_at': datetime.now().isoformat(),
+                'checked_at': datetime.now().isoformat()
+            }
+        print(f"🧭 Learned container selector for {key}: {selector}")
+        self.save()
+    
+    def report(self) -> Dict[str, Dict]:
+        """Learned strategies with their hit, miss and discovery counts"""
+        self.load()
+        with self.lock:
+            return {key: dict(strategy) for key, strategy in self.strategies.items()}
+
+
+# Shared by every scraper instance in the process
+selector_cache = SelectorCache(os.getenv("SELECTOR_CACHE_FILE", "selector_cache.json"))
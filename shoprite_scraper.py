@@ -2,6 +2,11 @@
 """
 Shoprite Food Products Scraper
 Server-side rendered React app - products in HTML!
+
+Listing pages also embed each product's data as JSON (a data-product-ga
+attribute per product and a productListJSON block with prices), which is
+decoded in one pass per page. Product markup is only searched for what the
+JSON lacks, and the DOM walk is kept as the fallback.
 """
 
 import requests
@@ -10,14 +15,42 @@ import json
 import csv
 from datetime import datetime
 from typing import List, Dict
-import re
-import time
+from fragment_cache import PageSource, fragment_cache
+from memory_guard import memory_guard
+from money import cents_to_rand, parse_cents
+from product_record import ShopriteProduct, json_default, wants
+from scrape_context import ScrapeContext
+
+
+# Fields the embedded JSON and the DOM both read from the same markup, so
+# the two extraction paths must agree on them (see benchmark.py shoprite_embedded)
+PARITY_FIELDS = ('name', 'price', 'product_url', 'category', 'in_stock')
+
+
+def find_div_by_class(soup, css_class: str):
+    """First div with css_class among its classes, or None
+    
+    A plain walk over the tree; soup.find(class_=...) runs its generic
+    matcher on every node and is several times slower on a full page.
+    """
+    for element in soup.descendants:
+        if element.name == 'div':
+            classes = element.get('class')
+            if classes and css_class in classes:
+                return element
+    return None
 
 
 class ShopriteScraper:
     """Scraper for Shoprite products"""
     
-    def __init__(self):
+    def __init__(self, use_embedded_data: bool = True):
+        """Initialize scraper
+        
+        Args:
+            use_embedded_data: Decode the JSON embedded in listing pages, falling back
+                to the DOM walk when a page has none (default: True)
+        """
         self.base_url = "https://www.shoprite.co.za"
         self.food_url = "https://www.shoprite.co.za/c-2413/All-Departments/Food"
         self.food_url_paginated = "https://www.shoprite.co.za/c-2413/All-Departments/Food?q=%3Arelevance%3AbrowseAllStoresFacetOff%3AbrowseAllStoresFacetOff&page={page}"
@@ -29,49 +62,189 @@ class ShopriteScraper:
         }
         self.session = requests.Session()
         self.products = []
+        self.context = ScrapeContext()
+        self.use_embedded_data = use_embedded_data
+        # Records of product containers whose markup is unchanged since the last run are reused
+        self.fragments = fragment_cache.category('shoprite', 'listing')
+        # One timestamp per page, shared by every product extracted from it
+        self.scraped_at = None
     
     def fetch_page(self, url: str) -> str:
         """Fetch HTML content from URL"""
         try:
             print(f"Fetching: {url}")
-            response = self.session.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, headers=self.headers, timeout=self.context.fetch_timeout(15))
             response.raise_for_status()
             print(f"✓ Page fetched successfully ({len(response.text)} bytes)")
             return response.text
         except requests.RequestException as e:
             print(f"❌ Error fetching page: {e}")
+            if self.context.should_stop():
+                print("⏱️  Request time budget used up")
             return None
     
     def parse_price(self, price_text: str) -> float:
-        """Parse price from text"""
-        if not price_text:
+        """Parse price from text (e.g. "R1,299.99" -> 1299.99)"""
+        return cents_to_rand(parse_cents(price_text))
+    
+    def extract_products(self, html: str, max_products: int = None, fields: tuple = None) -> List[Dict]:
+        """Extract product information from HTML
+        
+        Args:
+            html: Page HTML
+            max_products: Stop extracting once this many products are found (optional)
+            fields: Only extract these product fields (optional, default: all)
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        source = PageSource(html)
+        self.scraped_at = datetime.now().isoformat()
+        
+        try:
+            if self.use_embedded_data:
+                products = self.extract_embedded_products(soup, max_products, fields, source)
+                if products is not None:
+                    return products
+                print("⚠️  No embedded product data, falling back to the page markup")
+            
+            return self.extract_dom_products(soup, max_products, fields, source)
+        finally:
+            # Products only hold plain strings, so the page tree can be freed now
+            soup.decompose()
+    
+    def extract_embedded_products(self, soup, max_products: int = None, fields: tuple = None,
+                                  source: PageSource = None) -> List[Dict]:
+        """Decode products from the JSON embedded in a listing page
+        
+        Returns None when the page carries no (readable) embedded data, so the
+        caller can fall back to the DOM walk. With source set, products whose
+        markup is unchanged since the last run are reused.
+        """
+        # Listing prices and promotion flags by product code. The product frames
+        # are siblings of this block, so finding it is the only full-tree search.
+        listing = {}
+        listing_elem = find_div_by_class(soup, 'productListJSON')
+        if listing_elem:
+            frames = listing_elem.find_next_siblings('div', attrs={'data-product-ga': True})
+            try:
+                listing = {item['code']: item.get('price') or {} for item in json.loads(listing_elem.get_text())}
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"  Could not decode productListJSON: {e}")
+        else:
+            frames = soup.find_all('div', attrs={'data-product-ga': True})
+        
+        if not frames:
             return None
         
-        # Remove whitespace and common text
-        price_text = price_text.replace('\n', '').replace('\r', '').strip()
-        price_text = price_text.replace('R', '').replace(',', '.')
+        print(f"\nFound {len(frames)} embedded products")
+        products = []
+        reused = 0
         
-        # Extract numbers
-        match = re.search(r'(\d+\.?\d*)', price_text)
-        if match:
+        for idx, frame in enumerate(frames):
+            if max_products and len(products) >= max_products:
+                break
+            
+            if self.context.should_stop():
+                print(f"⏱️  Time budget used up after {len(products)} products")
+                break
+            
             try:
-                return float(match.group(1))
-            except:
+                data = json.loads(frame['data-product-ga'])
+            except ValueError as e:
+                print(f"  Could not decode embedded product {idx}: {e}")
                 return None
-        return None
+            
+            try:
+                listing_price = listing.get(data.get('id'), {})
+                product, from_cache = self.fragments.extract(
+                    source, frame, fields, ShopriteProduct, self.scraped_at,
+                    lambda: self.embedded_product_data(frame, data, listing_price, fields, source),
+                    extra=json.dumps(listing_price, sort_keys=True)
+                )
+                reused += from_cache
+                if product.get('name'):
+                    products.append(product)
+            except Exception as e:
+                print(f"  Error parsing product {idx}: {e}")
+                continue
+        
+        if reused:
+            print(f"♻️  Reused {reused}/{len(products)} unchanged products")
+        return products
     
-    def extract_products(self, html: str) -> List[Dict]:
-        """Extract product information from HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
+    def embedded_product_data(self, frame, data: Dict, listing_price: Dict, fields: tuple = None,
+                              source: PageSource = None) -> ShopriteProduct:
+        """Build a product from its data-product-ga JSON and listing price
+        
+        The markup is only searched for what the JSON lacks: the product link
+        (for URL and, without a JSON category, the category), stock when the
+        JSON leaves it blank, and was/save prices of products on promotion.
+        With source set, a search is skipped when the frame's raw markup
+        shows it can't match.
+        """
+        product = ShopriteProduct(scraped_at=self.scraped_at or datetime.now().isoformat())
+        product['product_code'] = data.get('id') or None
+        product['name'] = (data.get('name') or '').strip()
+        markup = source.fragment(frame) if source else None
+        
+        if wants(fields, 'brand') and (data.get('brand') or '').strip():
+            product['brand'] = data['brand'].strip()
+        
+        if wants(fields, 'product_url', 'category'):
+            link_elem = frame.find('a', class_='product-listening-click')
+            if link_elem and link_elem.get('href'):
+                self.set_product_url(product, link_elem['href'])
+            if (data.get('category') or '').strip():
+                product['category'] = data['category'].strip()
+        
+        if wants(fields, 'image_url') and data.get('product_image_url'):
+            product['image_url'] = data['product_image_url']
+        
+        if wants(fields, 'price', 'special_price', 'original_price', 'savings', 'on_special'):
+            price = listing_price.get('value')
+            product['price'] = cents_to_rand(parse_cents(price if price is not None else data.get('price')))
+            if listing_price.get('promotionalPrice'):
+                product['on_special'] = True
+                product['special_price'] = product['price']
+                # Was and save prices are only in the markup
+                if markup is None or 'special-price__was' in markup or 'special-price__save' in markup:
+                    self.extract_prices(frame, product)
+        
+        if wants(fields, 'in_stock'):
+            stock = (data.get('stock') or '').strip().lower()
+            if stock:
+                product['in_stock'] = 'out' not in stock and 'unavailable' not in stock
+            elif (markup is None or 'out-of-stock' in markup) and frame.find(class_='out-of-stock'):
+                product['in_stock'] = False
+        
+        return product
+    
+    def extract_dom_products(self, soup, max_products: int = None, fields: tuple = None,
+                             source: PageSource = None) -> List[Dict]:
+        """Extract products by walking each product container in the page markup
+        
+        With source set, products whose markup is unchanged since the last run are reused.
+        """
         products = []
+        reused = 0
         
         # Find all product containers
         product_containers = soup.find_all('div', class_='item-product')
         print(f"\nFound {len(product_containers)} product containers")
         
         for idx, container in enumerate(product_containers):
+            if max_products and len(products) >= max_products:
+                break
+            
+            if self.context.should_stop():
+                print(f"⏱️  Time budget used up after {len(products)} products")
+                break
+            
             try:
-                product = self.extract_product_data(container)
+                product, from_cache = self.fragments.extract(
+                    source, container, fields, ShopriteProduct, self.scraped_at,
+                    lambda: self.extract_product_data(container, fields)
+                )
+                reused += from_cache
                 if product and product.get('name'):
                     products.append(product)
                     if (idx + 1) % 10 == 0:
@@ -80,25 +253,17 @@ class ShopriteScraper:
                 print(f"  Error parsing product {idx}: {e}")
                 continue
         
+        if reused:
+            print(f"♻️  Reused {reused}/{len(products)} unchanged products")
         return products
     
-    def extract_product_data(self, container) -> Dict:
-        """Extract product data from container element"""
-        product = {
-            'name': None,
-            'brand': None,
-            'price': None,
-            'original_price': None,
-            'special_price': None,
-            'savings': None,
-            'image_url': None,
-            'product_url': None,
-            'product_code': None,
-            'category': None,
-            'in_stock': True,
-            'on_special': False,
-            'scraped_at': datetime.now().isoformat()
-        }
+    def extract_product_data(self, container, fields: tuple = None) -> ShopriteProduct:
+        """Extract product data from container element
+        
+        Fields not listed in fields are skipped and left at their defaults.
+        The name is always extracted since products without one are dropped.
+        """
+        product = ShopriteProduct(scraped_at=self.scraped_at or datetime.now().isoformat())
         
         # Extract product code
         product['product_code'] = container.get('data-product-code')
@@ -109,32 +274,48 @@ class ShopriteScraper:
             product['name'] = link_elem.get('title', '').strip()
         
         # Extract product URL (already have link_elem from name extraction)
-        if link_elem and link_elem.get('href'):
-            href = link_elem['href']
-            product['product_url'] = href if href.startswith('http') else f"{self.base_url}{href}"
-            
-            # Extract category from URL
-            # URL pattern: https://www.shoprite.co.za/All-Departments/Food/{Category}/...
-            try:
-                url_parts = product['product_url'].split('/')
-                if 'Food' in url_parts:
-                    food_index = url_parts.index('Food')
-                    # Category is the next segment after 'Food'
-                    if food_index + 1 < len(url_parts):
-                        category = url_parts[food_index + 1]
-                        # Clean up category name (replace hyphens with spaces, title case)
-                        product['category'] = category.replace('-', ' ').title()
-            except (ValueError, IndexError):
-                # If parsing fails, leave category as None
-                pass
+        if link_elem and link_elem.get('href') and wants(fields, 'product_url', 'category'):
+            self.set_product_url(product, link_elem['href'])
         
         # Extract image (check multiple attributes for lazy-loaded images)
-        img_elem = container.find('img')
+        img_elem = container.find('img') if wants(fields, 'image_url') else None
         if img_elem:
             img_src = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-original-src')
             if img_src:
                 product['image_url'] = img_src if img_src.startswith('http') else f"{self.base_url}{img_src}"
         
+        if wants(fields, 'price', 'special_price', 'original_price', 'savings', 'on_special'):
+            self.extract_prices(container, product)
+        
+        # Check stock status
+        if wants(fields, 'in_stock'):
+            out_of_stock = container.find(class_='out-of-stock')
+            if out_of_stock:
+                product['in_stock'] = False
+        
+        return product
+    
+    def set_product_url(self, product: Dict, href: str):
+        """Fill product_url and the category taken from it"""
+        product['product_url'] = href if href.startswith('http') else f"{self.base_url}{href}"
+        
+        # Extract category from URL
+        # URL pattern: https://www.shoprite.co.za/All-Departments/Food/{Category}/...
+        try:
+            url_parts = product['product_url'].split('/')
+            if 'Food' in url_parts:
+                food_index = url_parts.index('Food')
+                # Category is the next segment after 'Food'
+                if food_index + 1 < len(url_parts):
+                    category = url_parts[food_index + 1]
+                    # Clean up category name (replace hyphens with spaces, title case)
+                    product['category'] = category.replace('-', ' ').title()
+        except (ValueError, IndexError):
+            # If parsing fails, leave category as None
+            pass
+    
+    def extract_prices(self, container, product: Dict):
+        """Fill price, special and savings fields of product from container"""
         # Extract prices (look for js-item-product-price first - always present)
         price_elem = container.find('div', class_='js-item-product-price')
         if price_elem:
@@ -163,85 +344,102 @@ class ShopriteScraper:
             save_elem = special_elem.find('div', class_='special-price__save')
             if save_elem:
                 product['savings'] = save_elem.get_text(strip=True)
-        
-        # Check stock status
-        out_of_stock = container.find(class_='out-of-stock')
-        if out_of_stock:
-            product['in_stock'] = False
-        
-        return product
     
-    def scrape(self, url: str = None, max_pages: int = 1, max_products: int = None) -> List[Dict]:
-        """Main scraping method with pagination support
+    def iter_pages(self, url: str = None, max_pages: int = 1, max_products: int = None, fields: tuple = None,
+                   context: ScrapeContext = None):
+        """Yield each page's products as soon as the page is extracted
         
-        Args:
-            url: Custom URL (if provided, ignores max_pages)
-            max_pages: Number of pages to scrape (default: 1)
-            max_products: Limit total products (optional)
+        Takes the same arguments as scrape. Only one page's parse tree and
+        products are held at a time, and self.products is not set.
         """
-        print("=" * 80)
-        print("Shoprite Food Products Scraper")
-        print("=" * 80)
-        
-        all_products = []
+        if context:
+            self.context = context
         
         if url:
             # Single custom URL
             print(f"\nTarget URL: {url}\n")
-            html = self.fetch_page(url)
-            if html:
-                products = self.extract_products(html)
-                all_products.extend(products)
+            page_urls = [url]
         else:
             # Paginated scraping
             print(f"\nScraping {max_pages} page(s) from Food section\n")
-            
-            for page_num in range(max_pages):
-                # Page numbering is 0-indexed (page 0, page 1, etc.)
-                if page_num == 0:
-                    # First page doesn't need page parameter
-                    page_url = self.food_url
-                else:
-                    page_url = self.food_url_paginated.format(page=page_num)
+            # Page numbering is 0-indexed (page 0, page 1, etc.); the first page doesn't need a page parameter
+            page_urls = [self.food_url if page_num == 0 else self.food_url_paginated.format(page=page_num)
+                         for page_num in range(max_pages)]
+        
+        found = 0
+        
+        try:
+            for page_num, page_url in enumerate(page_urls):
+                if self.context.should_stop():
+                    print("⏱️  Time budget used up, returning products gathered so far")
+                    break
+                
+                if not memory_guard.wait(self.context):
+                    print("⏱️  Time budget used up waiting for memory, returning products gathered so far")
+                    break
                 
-                print(f"\n--- Page {page_num + 1} of {max_pages} ---")
+                if not url:
+                    print(f"\n--- Page {page_num + 1} of {max_pages} ---")
                 html = self.fetch_page(page_url)
                 
                 if not html:
                     print(f"Failed to fetch page {page_num + 1}, stopping...")
                     break
                 
-                products = self.extract_products(html)
+                remaining = max_products - found if max_products else None
+                products = self.extract_products(html, max_products=remaining, fields=fields)
                 print(f"✓ Extracted {len(products)} products from page {page_num + 1}")
-                all_products.extend(products)
+                found += len(products)
+                
+                yield products
                 
                 # Check if we should stop early
-                if max_products and len(all_products) >= max_products:
-                    all_products = all_products[:max_products]
+                if max_products and found >= max_products:
                     print(f"\n✓ Reached max_products limit ({max_products})")
                     break
                 
                 # Be respectful - add delay between pages
-                if page_num < max_pages - 1:
-                    import time
-                    time.sleep(2)
+                if page_num < len(page_urls) - 1:
+                    self.context.pause(2)
                     print("  (Waiting 2 seconds before next page...)")
+        finally:
+            # One write per scrape rather than per page
+            self.fragments.save()
+    
+    def iter_products(self, url: str = None, max_pages: int = 1, max_products: int = None, fields: tuple = None,
+                      context: ScrapeContext = None):
+        """Yield products one at a time across pages (see iter_pages)"""
+        for products in self.iter_pages(url, max_pages, max_products, fields, context):
+            yield from products
+    
+    def scrape(self, url: str = None, max_pages: int = 1, max_products: int = None, fields: tuple = None,
+               context: ScrapeContext = None) -> List[Dict]:
+        """Main scraping method with pagination support
+        
+        Args:
+            url: Custom URL (if provided, ignores max_pages)
+            max_pages: Number of pages to scrape (default: 1)
+            max_products: Limit total products (optional)
+            fields: Only extract these product fields (optional, default: all)
+            context: Time budget for the whole scrape (optional, sets context.partial when cut short)
+        """
+        print("=" * 80)
+        print("Shoprite Food Products Scraper")
+        print("=" * 80)
+        
+        all_products = list(self.iter_products(url, max_pages, max_products, fields, context))
         
         print(f"\n{'=' * 80}")
         print(f"✓ Total products extracted: {len(all_products)}")
         print(f"{'=' * 80}")
         
-        if max_products and len(all_products) > max_products:
-            all_products = all_products[:max_products]
-            print(f"  Limited to {max_products} products")
-        
         self.products = all_products
         return all_products
     
     def save_json(self, filename: str = 'shoprite_products.json'):
         """Save products to JSON file"""
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.products, f, indent=2, ensure_ascii=False)
+            json.dump(self.products, f, indent=2, ensure_ascii=False, default=json_default)
         print(f"✓ Saved {len(self.products)} products to {filename}")
     
     def save_csv(self, filename: str = 'shoprite_products.csv'):
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Last-good snapshot store for the Simple Grocery API
+Keeps the most recent successful scrape of every (store, category, page) on
+disk, so endpoints can fall back to slightly stale data when a retailer
+scrape fails instead of returning a 500.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from scrape_cache import ScrapeCache
+from product_record import json_default
+
+
+class SnapshotStore:
+    """One JSON file per scraped page, replaced atomically on every good scrape"""
+    
+    def __init__(self, directory: str = "snapshots", max_age_seconds: int = 7 * 24 * 3600):
+        """Initialize store
+        
+        Args:
+            directory: Folder holding the snapshot files (created on first save)
+            max_age_seconds: Snapshots older than this are not served (default: 7 days)
+        """
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+    
+    def path(self, key: Tuple[str, str, int]) -> str:
+        """File path for a (store, category, page) key"""
+        store, category, page = key
+        return os.path.join(self.directory, f"{store}__{category}__{page}.json")
+    
+    def load(self, key: Tuple[str, str, int]) -> Optional[Dict]:
+        """Return the snapshot for key, or None if missing, unreadable or too old"""
+        try:
+            with open(self.path(key), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load snapshot {self.path(key)}: {e}")
+            return None
+        
+        if time.time() - snapshot['scraped_at'] > self.max_age_seconds:
+            return None
+        return snapshot
+    
+    def save(self, key: Tuple[str, str, int], products: List[Dict], url: str,
+             max_products: Optional[int] = None, fields: Optional[Tuple[str, ...]] = None,
+             replace_after_seconds: int = 3600):
+        """Record a successful scrape for key
+        
+        A snapshot holding fewer products or fields than the existing one only
+        replaces it once the existing one is older than replace_after_seconds.
+        """
+        existing = self.load(key)
+        if existing and time.time() - existing['scraped_at'] <= replace_after_seconds:
+            scraped_fields = tuple(fields) if fields else None
+            existing_fields = tuple(existing['fields']) if existing['fields'] else None
+            if not ScrapeCache.covers(max_products, existing['max_products'], scraped_fields, existing_fields):
+                return
+        
+        snapshot = {
+            'products': products,
+            'url': url,
+            'max_products': max_products,
+            'fields': list(fields) if fields else None,
+            'scraped_at': time.time()
+        }
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a half-written snapshot
+            temp_path = self.path(key) + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, default=json_default)
+            os.replace(temp_path, self.path(key))
+        except OSError as e:
+            print(f"⚠️  Could not save snapshot {self.path(key)}: {e}")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the Rand amount parsing shared by the scrapers
+Checks that thousands separators, unit prices, per-kg prices and multibuy
+offers are parsed to the item's own price (or to None) and never to a
+wrong amount.
+"""
+
+import sys
+from money import parse_cents, parse_prices
+
+# Text -> expected cents from parse_cents
+CENTS = [
+    ("R12.99", 1299),
+    ("R12,99", 1299),
+    ("19.99 R", 1999),
+    ("R1,299.99", 129999),
+    ("R1 299.99", 129999),
+    ("R1 299.99", 129999),
+    ("R12 500g", 1200),
+    ("R12 500 ml", 1200),
+    ("500g R12.99", 1299),
+    ("2 for R80", None),
+    ("2 for 80", None),
+    ("R5.20 per 100g", None),
+    ("R12/kg", 1200),
+    ("R56.99  Per Kg", 5699),
+    ("R56.99 per kg R5.70 per 100g", 5699),
+    ("R89.99 R8.99 per kg", 8999),
+    ("R25.99 R5.20 per 100g", 2599),
+    ("R49.99 2 for R80", 4999),
+]
+
+# Text (and strike-through text) -> expected now/was/save cents from parse_prices
+PRICES = [
+    (("R49.99 2 for R80", None), {'now': 4999, 'was': None, 'save': None}),
+    (("R25.99 R5.20 per 100g", None), {'now': 2599, 'was': None, 'save': None}),
+    (("Was R1 499.00 Now R1 299.00", None), {'now': 129900, 'was': 149900, 'save': 20000}),
+    (("R30.00 R25.00", "R30.00"), {'now': 2500, 'was': 3000, 'save': 500}),
+    (("R30.00 R25.00", None), {'now': 3000, 'was': None, 'save': None}),
+    (("R56.99 Per Kg", None), {'now': 5699, 'was': None, 'save': None}),
+]
+
+
+def test_parse_cents():
+    """Check amounts, thousands separators and skipped unit/multibuy prices"""
+    failures = [(text, parse_cents(text), expected) for text, expected in CENTS
+                if parse_cents(text) != expected]
+    assert not failures, f"parse_cents (text, got, expected): {failures}"
+
+
+def test_parse_prices():
+    """Check that unit and multibuy amounts never become the now or was price"""
+    failures = [(args, parse_prices(*args), expected) for args, expected in PRICES
+                if parse_prices(*args) != expected]
+    assert not failures, f"parse_prices (args, got, expected): {failures}"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing money parsing")
+    print("=" * 50)
+    try:
+        test_parse_cents()
+        test_parse_prices()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print("✅ All prices parsed correctly")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test that the API's queries use the indexes from DATABASE_INDEXES
+Seeds a throwaway schema in a local PostgreSQL database (DB_* or
+DATABASE_URL environment variables, as for the API) and checks the
+EXPLAIN plans of the queries the endpoints build (from the same helpers
+they call). The schema is dropped afterwards.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+SCHEMA = "query_plan_test"
+
+# Every connection the API opens below works in the throwaway schema
+os.environ["PGOPTIONS"] = f"-c search_path={SCHEMA}"
+
+from api_old import (ScrapeSession, SCRAPE_CLAIM_SQL, get_db_connection, init_database,
+                     price_changes_query, products_query, recent_changes_query)
+
+# Keys deep into the seeded rows, as decoded from a next_cursor
+PRODUCTS_AFTER = (datetime.now() - timedelta(minutes=5000), 30000)
+CHANGES_AFTER = (datetime.now() - timedelta(minutes=50000), 50000)
+
+# Endpoint query -> (SQL, params) the endpoint builds, index it must use
+QUERIES = [
+    ("/api/products?store&category", products_query("shoprite", "category-3", limit=100),
+     "idx_products_store_category_scraped_id"),
+    ("/api/products?store&category&cursor", products_query("shoprite", "category-3", PRODUCTS_AFTER, 100),
+     "idx_products_store_category_scraped_id"),
+    ("/api/products?store", products_query("picknpay", limit=100), "idx_products_store_scraped_id"),
+    ("/api/products?cursor", products_query(after=PRODUCTS_AFTER, limit=100), "idx_products_scraped_id"),
+    ("/api/price-changes", price_changes_query(limit=50), "idx_price_history_changed_id"),
+    ("/api/price-changes?cursor", price_changes_query(after=CHANGES_AFTER, limit=50),
+     "idx_price_history_changed_id"),
+    ("/api/stats recent changes", recent_changes_query(), "price_change_counts_pkey"),
+    ("/api/stats?exact=true recent changes", recent_changes_query(exact=True), "idx_price_history_changed_id"),
+    ("ScrapeSession.claim", (SCRAPE_CLAIM_SQL, ScrapeSession("woolworths", "category-7").claim_params()),
+     "idx_scraping_cache_store_category_scraped"),
+]
+
+
+def seed(cursor):
+    """Fill the tables with enough rows that sequential scans stop being cheapest"""
+    cursor.execute("""
+        INSERT INTO products (store, category, product_id, name, price, image_url, scraped_at)
+        SELECT (ARRAY['shoprite', 'picknpay', 'woolworths'])[1 + i % 3],
+               'category-' || (i % 20),
+               'seed_' || i,
+               'Seed product ' || i,
+               10 + (i % 500),
+               '',
+               NOW() - (i % 10000) * INTERVAL '1 minute'
+        FROM generate_series(1, 60000) AS i
+    """)
+    cursor.execute("""
+        INSERT INTO price_history (product_id, old_price, new_price, changed_at)
+        SELECT 1 + i % 60000, 10, 11, NOW() - i * INTERVAL '1 minute'
+        FROM generate_series(1, 120000) AS i
+    """)
+    cursor.execute("""
+        INSERT INTO scraping_cache (store, category, hour_key, scraped_at, products_hash)
+        SELECT (ARRAY['shoprite', 'picknpay', 'woolworths'])[1 + i % 3],
+               'category-' || (i % 20),
+               'hour-' || i,
+               NOW() - i * INTERVAL '1 hour',
+               md5(i::text)
+        FROM generate_series(1, 20000) AS i
+    """)
+    cursor.execute("""
+        INSERT INTO price_change_counts (hour, changes)
+        SELECT date_trunc('hour', NOW()) - i * INTERVAL '1 hour', 1 + i % 7
+        FROM generate_series(0, 20000) AS i
+    """)
+    cursor.execute("ANALYZE products")
+    cursor.execute("ANALYZE price_history")
+    cursor.execute("ANALYZE scraping_cache")
+    cursor.execute("ANALYZE price_change_counts")
+
+
+def plan_nodes(plan):
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(cursor, query, params):
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return list(plan_nodes(plan[0]["Plan"]))
+
+
+def test_query_plans():
+    """Check that each endpoint query is served by its index"""
+    print("🧪 Testing query plans")
+    print("=" * 50)
+    
+    conn = get_db_connection()
+    if not conn:
+        print("⚠️  No local database, skipping query plan test")
+        return
+    
+    cursor = conn.cursor()
+    failures = []
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.commit()
+        
+        assert init_database(), "init_database failed"
+        seed(cursor)
+        conn.commit()
+        
+        for label, (query, params), index in QUERIES:
+            nodes = explain(cursor, query, params)
+            indexes = {node.get("Index Name") for node in nodes}
+            seq_scans = [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"]
+            if index in indexes and not seq_scans:
+                print(f"✅ {label}: uses {index}")
+            else:
+                failures.append(label)
+                print(f"❌ {label}: expected {index}, got indexes {sorted(i for i in indexes if i)}, "
+                      f"sequential scans on {seq_scans}")
+    finally:
+        conn.rollback()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        cursor.close()
+        conn.close()
+    
+    assert not failures, f"Queries not using their index: {failures}"
+
+
+if __name__ == "__main__":
+    try:
+        test_query_plans()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print("\n✅ All queries use their indexes")
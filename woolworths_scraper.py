@@ -5,108 +5,106 @@ Scrapes products from Woolworths categories with pagination support
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, UnicodeDammit
 import json
 import csv
 from datetime import datetime
-import time
+from functools import cached_property
 import re
+from typing import Dict
 from urllib.parse import urljoin, urlparse
+from categories import WOOLWORTHS_CATEGORIES, WOOLWORTHS_PAGE_SIZE
+from fragment_cache import PageSource, fragment_cache
+from memory_guard import memory_guard
+from money import cents_to_rand, parse_cents
+from product_record import WoolworthsProduct, json_default, wants
+from scrape_context import ScrapeContext
+from selector_cache import page_template, selector_cache
 
+# Product image URLs embedded in the page's script tags
+ASSET_URL_RE = re.compile(r'https://assets\.woolworthsstatic\.co\.za/[^"\']*')
+URL_TOKEN_RE = re.compile(r'[A-Za-z0-9]+')
 
-# Available Woolworths categories
-WOOLWORTHS_CATEGORIES = {
-    'fruit-vegetables': {
-        'name': 'Fruit, Vegetables & Salads',
-        'url': 'https://www.woolworths.co.za/cat/Food/Fruit-Vegetables-Salads/_/N-lllnam',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Fruit-Vegetables-Salads/_/N-lllnam?No={page}&Nrpp=24'
-    },
-    'meat-poultry': {
-        'name': 'Meat, Poultry & Fish',
-        'url': 'https://www.woolworths.co.za/cat/Food/Meat-Poultry-Fish/_/N-d87rb7',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Meat-Poultry-Fish/_/N-d87rb7?No={page}&Nrpp=24'
-    },
-    'dairy-eggs': {
-        'name': 'Milk, Dairy & Eggs',
-        'url': 'https://www.woolworths.co.za/cat/Food/Milk-Dairy-Eggs/_/N-1sqo44p',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Milk-Dairy-Eggs/_/N-1sqo44p?No={page}&Nrpp=24'
-    },
-    'ready-meals': {
-        'name': 'Ready Meals',
-        'url': 'https://www.woolworths.co.za/cat/Food/Ready-Meals/_/N-s2csbp',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Ready-Meals/_/N-s2csbp?No={page}&Nrpp=24'
-    },
-    'deli-entertaining': {
-        'name': 'Deli & Entertaining',
-        'url': 'https://www.woolworths.co.za/cat/Food/Deli-Entertaining/_/N-13b8g51',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Deli-Entertaining/_/N-13b8g51?No={page}&Nrpp=24'
-    },
-    'food-to-go': {
-        'name': 'Food To Go',
-        'url': 'https://www.woolworths.co.za/cat/Food/Food-To-Go/_/N-11buko0',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Food-To-Go/_/N-11buko0?No={page}&Nrpp=24'
-    },
-    'bakery': {
-        'name': 'Bakery',
-        'url': 'https://www.woolworths.co.za/cat/Food/Bakery/_/N-1bm2new',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Bakery/_/N-1bm2new?No={page}&Nrpp=24'
-    },
-    'frozen-food': {
-        'name': 'Frozen Food',
-        'url': 'https://www.woolworths.co.za/cat/Food/Frozen-Food/_/N-j8pkwq',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Frozen-Food/_/N-j8pkwq?No={page}&Nrpp=24'
-    },
-    'pantry': {
-        'name': 'Pantry',
-        'url': 'https://www.woolworths.co.za/cat/Food/Pantry/_/N-1lw4dzx',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Pantry/_/N-1lw4dzx?No={page}&Nrpp=24'
-    },
-    'chocolates-sweets': {
-        'name': 'Chocolates, Sweets & Snacks',
-        'url': 'https://www.woolworths.co.za/cat/Food/Chocolates-Sweets-Snacks/_/N-1yz1i0m',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Chocolates-Sweets-Snacks/_/N-1yz1i0m?No={page}&Nrpp=24'
-    },
-    'beverages': {
-        'name': 'Beverages & Juices',
-        'url': 'https://www.woolworths.co.za/cat/Food/Beverages-Juices/_/N-mnxddc',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Beverages-Juices/_/N-mnxddc?No={page}&Nrpp=24'
-    },
-    'pets': {
-        'name': 'Pets',
-        'url': 'https://www.woolworths.co.za/cat/Food/Pets/_/N-l1demz',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Pets/_/N-l1demz?No={page}&Nrpp=24'
-    },
-    'household': {
-        'name': 'Household',
-        'url': 'https://www.woolworths.co.za/cat/Food/Household/_/N-vvikef',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Household/_/N-vvikef?No={page}&Nrpp=24'
-    },
-    'cleaning': {
-        'name': 'Cleaning',
-        'url': 'https://www.woolworths.co.za/cat/Food/Cleaning/_/N-o1v4pe',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Cleaning/_/N-o1v4pe?No={page}&Nrpp=24'
-    },
-    'toiletries-health': {
-        'name': 'Toiletries & Health',
-        'url': 'https://www.woolworths.co.za/cat/Food/Toiletries-Health/_/N-1q1wl1r',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Toiletries-Health/_/N-1q1wl1r?No={page}&Nrpp=24'
-    },
-    'kids': {
-        'name': 'Kids',
-        'url': 'https://www.woolworths.co.za/cat/Food/Kids/_/N-ymaf0z',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Kids/_/N-ymaf0z?No={page}&Nrpp=24'
-    },
-    'flowers-plants': {
-        'name': 'Flowers & Plants',
-        'url': 'https://www.woolworths.co.za/cat/Food/Flowers-Plants/_/N-1z13rv1',
-        'paginated': 'https://www.woolworths.co.za/cat/Food/Flowers-Plants/_/N-1z13rv1?No={page}&Nrpp=24'
-    }
-}
+# Product code formats in container text, tried in order
+CODE_PATTERNS = (
+    re.compile(r'\((\d+)\)'),  # (123) format
+    re.compile(r'Code:\s*(\w+)'),
+    re.compile(r'SKU:\s*(\w+)'),
+)
+SPECIAL_INDICATORS = ('special', 'sale', 'discount', 'reduced', 'save')
+SIZE_WORDS = ('kg', 'g', 'ml', 'l', 'pack', 'pk')
+
+
+class ContainerText:
+    """One product container plus its text and lookups, each computed once
+    
+    get_text() walks the whole container subtree, so the container filter
+    and every field extractor share these instead of calling it again.
+    """
+    
+    def __init__(self, element):
+        self.element = element
+    
+    @cached_property
+    def text(self) -> str:
+        return self.element.get_text()
+    
+    @cached_property
+    def stripped(self) -> str:
+        return self.text.strip()
+    
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+    
+    @cached_property
+    def product_id(self) -> str:
+        """Product id from the container's data attributes or SKU icon"""
+        element = self.element
+        product_id = (element.get('data-cnstrc-item-id') or
+                      element.get('data-product-id') or
+                      element.get('data-item-id'))
+        if not product_id:
+            icon_elem = element.select_one('.icon[data-id]')
+            if icon_elem:
+                product_id = icon_elem.get('data-id')
+        return product_id
+    
+    @cached_property
+    def has_image(self) -> bool:
+        """Whether an <img> in the container has a real source (otherwise the image comes from scripts)"""
+        for img_elem in self.element.find_all('img'):
+            img_src = (img_elem.get('src') or img_elem.get('data-src') or
+                       img_elem.get('data-original') or img_elem.get('data-lazy-src'))
+            if img_src and not img_src.startswith('data:'):
+                return True
+        return False
+    
+    def looks_like_product(self) -> bool:
+        """Containers that are too small or have no price/size text are skipped"""
+        return len(self.stripped) > 10 and ('R' in self.stripped or any(word in self.lower for word in SIZE_WORDS))
 
 
 class WoolworthsScraper:
     """Woolworths scraper with category and pagination support"""
     
+    # Product container selectors, tried in order until one matches
+    CONTAINER_SELECTORS = [
+        'article.product-card',  # Woolworths specific - main product cards
+        'div.product-list__item',  # Woolworths specific
+        'div[data-cnstrc-item-id]',  # Woolworths specific
+        'div[data-testid*="product"]',
+        'div.product-item',
+        'div.product-tile',
+        'div[class*="product"]',
+        'article[class*="product"]',
+        'div[class*="item"]',
+        'div[class*="tile"]',
+        'div[class*="card"]',
+        'div[class*="grid"] > div',
+        'div[class*="list"] > div'
+    ]
+    
     def __init__(self, category: str = None):
         """Initialize scraper
         
@@ -134,6 +132,15 @@ class WoolworthsScraper:
             self.paginated_category_url = self.category_info['paginated']
         
         self.products = []
+        self.selector_cache = selector_cache
+        # Records of product containers whose markup is unchanged since the last run are reused
+        self.fragments = fragment_cache.category('woolworths', self.category)
+        self.context = ScrapeContext()
+        # One timestamp per page, shared by every product extracted from it
+        self.scraped_at = None
+        # Script image index of the page currently being extracted (see page_image_index)
+        self.image_index = None
+        self.image_index_root = None
         
         # Headers to mimic a real browser
         self.headers = {
@@ -145,50 +152,44 @@ class WoolworthsScraper:
             'Upgrade-Insecure-Requests': '1',
         }
     
-    def fetch_page(self, url: str) -> BeautifulSoup:
-        """Fetch and parse a page"""
+    def fetch_html(self, url: str) -> bytes:
+        """Fetch a page's raw HTML (None on failure)"""
         try:
             print(f"Fetching: {url}")
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = requests.get(url, headers=self.headers, timeout=self.context.fetch_timeout(10))
             response.raise_for_status()
             
             print(f"✓ Page fetched successfully ({len(response.content)} bytes)")
-            return BeautifulSoup(response.content, 'html.parser')
+            return response.content
             
         except requests.RequestException as e:
             print(f"❌ Error fetching page: {e}")
+            if self.context.should_stop():
+                print("⏱️  Request time budget used up")
             return None
     
+    def fetch_page(self, url: str) -> BeautifulSoup:
+        """Fetch and parse a page"""
+        html = self.fetch_html(url)
+        return BeautifulSoup(html, 'html.parser') if html else None
+    
     def parse_price(self, price_text: str) -> float:
-        """Parse price from text"""
-        if not price_text:
-            return None
-        
-        # Remove currency symbols and extract number
-        price_clean = re.sub(r'[^\d.,]', '', price_text)
-        price_clean = price_clean.replace(',', '.')
-        
-        try:
-            return float(price_clean)
-        except ValueError:
-            return None
+        """Parse price from text (e.g. "R1,299.99" -> 1299.99)"""
+        return cents_to_rand(parse_cents(price_text))
     
-    def extract_product_data(self, product_element) -> dict:
-        """Extract product data from product element"""
-        product = {
-            'name': None,
-            'price': None,
-            'original_price': None,
-            'special_price': None,
-            'savings': None,
-            'image_url': None,
-            'product_url': None,
-            'product_code': None,
-            'category': self.category_name,
-            'in_stock': True,
-            'on_special': False,
-            'scraped_at': datetime.now().isoformat()
-        }
+    def extract_product_data(self, product_element, fields: tuple = None) -> WoolworthsProduct:
+        """Extract product data from product element
+        
+        Fields not listed in fields are skipped and left at their defaults.
+        The name is always extracted since products without one are dropped.
+        product_element may be a ContainerText to reuse text already computed.
+        """
+        container = product_element if isinstance(product_element, ContainerText) else ContainerText(product_element)
+        product_element = container.element
+        product = WoolworthsProduct(
+            category=self.category_name,
+            scraped_at=self.scraped_at or datetime.now().isoformat()
+        )
         
         try:
             # Extract product name - try multiple approaches
@@ -213,9 +214,8 @@ class WoolworthsScraper:
             
             # If no name found, try getting text from the element itself
             if not name:
-                text = product_element.get_text().strip()
                 # Look for text that might be a product name (not too long, not just numbers)
-                lines = [line.strip() for line in text.split('\n') if line.strip()]
+                lines = [line.strip() for line in container.stripped.split('\n') if line.strip()]
                 for line in lines:
                     if 5 < len(line) < 100 and not line.isdigit() and 'R' not in line:
                         name = line
@@ -224,278 +224,347 @@ class WoolworthsScraper:
             product['name'] = name
             
             # Extract product URL
-            link_elem = product_element.find('a', href=True)
+            link_elem = product_element.find('a', href=True) if wants(fields, 'product_url') else None
             if link_elem:
                 href = link_elem['href']
                 product['product_url'] = href if href.startswith('http') else f"{self.base_url}{href}"
             
-            # Extract image - try multiple approaches for Woolworths
-            img_url = None
-            
-            # Try to find image in various elements (Woolworths specific)
-            img_selectors = [
-                '.product--image img',  # Woolworths specific
-                '.product-card__img',  # Woolworths specific
-                '.lazyload-wrapper img',  # Woolworths specific
-                'img[src]',
-                'img[data-src]',
-                'img[data-original]',
-                'img[data-lazy-src]',
-                '.product-image img',
-                '.product-card img',
-                '.product-item img',
-                'img'
-            ]
-            
-            for selector in img_selectors:
-                img_elem = product_element.select_one(selector)
-                if img_elem:
-                    # Try multiple attributes for image source
-                    img_src = (img_elem.get('src') or 
-                              img_elem.get('data-src') or 
-                              img_elem.get('data-original') or
-                              img_elem.get('data-lazy-src'))
-                    
-                    if img_src and not img_src.startswith('data:'):
-                        # Clean up the URL - handle HTML entities
-                        img_src = img_src.replace('&amp;', '&')
-                        
-                        # Clean up the URL
-                        if img_src.startswith('//'):
-                            img_src = 'https:' + img_src
-                        elif not img_src.startswith('http'):
-                            img_src = f"{self.base_url}{img_src}"
-                        
-                        img_url = img_src
-                        break
-            
-            # If no image found in elements, try to extract from script tags
-            if not img_url:
-                # Get product ID for matching
-                product_id = (product_element.get('data-cnstrc-item-id') or 
-                             product_element.get('data-product-id') or
-                             product_element.get('data-item-id'))
-                
-                # Also check for SKU ID in icon elements
-                if not product_id:
-                    icon_elem = product_element.select_one('.icon[data-id]')
-                    if icon_elem:
-                        product_id = icon_elem.get('data-id')
-                
-                if product_id:
-                    # Look for image URLs in script tags that match this product
-                    import re
-                    for script in product_element.find_all('script'):
-                        if script.string:
-                            # Look for woolworthsstatic.co.za URLs in script content
-                            matches = re.findall(r'https://assets\.woolworthsstatic\.co\.za/[^"\']*', script.string)
-                            for match in matches:
-                                if product_id in match:
-                                    img_url = match
-                                    break
-                            if img_url:
-                                break
-                    
-                    # If still no image, try to find in parent scripts
-                    if not img_url:
-                        parent = product_element.parent
-                        while parent and not img_url:
-                            for script in parent.find_all('script'):
-                                if script.string:
-                                    matches = re.findall(r'https://assets\.woolworthsstatic\.co\.za/[^"\']*', script.string)
-                                    for match in matches:
-                                        if product_id in match:
-                                            img_url = match
-                                            break
-                                    if img_url:
-                                        break
-                            parent = parent.parent
+            if wants(fields, 'image_url'):
+                product['image_url'] = self.extract_image_url(product_element, container.product_id)
             
-            product['image_url'] = img_url
+            # Remaining fields all work on the element text
+            if not wants(fields, 'price', 'on_special', 'product_code'):
+                return product
             
             # Extract price - look for price patterns in text
-            text = product_element.get_text()
-            
-            # Try to get price from data attributes first (Woolworths specific)
-            price_attr = product_element.get('data-cnstrc-item-price')
-            if price_attr:
-                product['price'] = self.parse_price(price_attr)
-            
-            # Try to find price in specific Woolworths elements
-            if not product['price']:
-                price_selectors = [
-                    '.product__price .price',  # Woolworths specific
-                    '.product-card__actions .price',  # Woolworths specific
-                    '.font-graphic .price',  # Woolworths specific
-                    '.product-price-combined .price',  # Woolworths specific
-                    '.price',  # Generic price class
-                    '.product-price',  # Generic product price
-                ]
-                
-                for selector in price_selectors:
-                    price_elem = product_element.select_one(selector)
-                    if price_elem:
-                        price_text = price_elem.get_text().strip()
-                        price = self.parse_price(price_text)
-                        if price and price > 0:
-                            product['price'] = price
-                            break
-            
-            # If no price from specific elements, look in text
-            if not product['price']:
-                price_patterns = [
-                    r'R\s*(\d+(?:\.\d{2})?)',  # R 19.99
-                    r'(\d+(?:\.\d{2})?)\s*R',  # 19.99 R
-                    r'R\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # R 1,234.56
-                ]
-                
-                for pattern in price_patterns:
-                    matches = re.findall(pattern, text)
-                    if matches:
-                        # Get the first valid price
-                        for match in matches:
-                            price = self.parse_price(match)
-                            if price and price > 0:
-                                product['price'] = price
-                                break
-                        if product['price']:
-                            break
+            if wants(fields, 'price'):
+                self.extract_price(product_element, container.text, product)
             
             # Check for special pricing indicators
-            special_indicators = ['special', 'sale', 'discount', 'reduced', 'save']
-            text_lower = text.lower()
-            for indicator in special_indicators:
-                if indicator in text_lower:
+            if wants(fields, 'on_special'):
+                if any(indicator in container.lower for indicator in SPECIAL_INDICATORS):
                     product['on_special'] = True
-                    break
             
             # Extract product code if available
-            code_patterns = [
-                r'\((\d+)\)',  # (123) format
-                r'Code:\s*(\w+)',
-                r'SKU:\s*(\w+)'
-            ]
-            
-            for pattern in code_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    product['product_code'] = match.group(1)
-                    break
+            if wants(fields, 'product_code'):
+                for pattern in CODE_PATTERNS:
+                    match = pattern.search(container.text)
+                    if match:
+                        product['product_code'] = match.group(1)
+                        break
             
         except Exception as e:
             print(f"⚠️  Error extracting product data: {e}")
         
         return product
     
-    def scrape_category(self, max_pages: int = 1, max_products: int = None) -> list:
-        """Scrape products from the category with pagination
+    def extract_image_url(self, product_element, product_id: str = None) -> str:
+        """Find the product image URL, falling back to asset URLs in script tags
         
         Args:
-            max_pages: Number of pages to scrape
-            max_products: Stop after N products (optional)
+            product_element: Product container
+            product_id: Id already read from the container (optional, looked up when missing)
         """
-        print("=" * 80)
-        print("Woolworths Scraper")
-        print("=" * 80)
-        print(f"Category: {self.category_name}")
-        print("=" * 80)
+        # Extract image - try multiple approaches for Woolworths
+        img_url = None
         
-        all_products = []
+        # Try to find image in various elements (Woolworths specific)
+        img_selectors = [
+            '.product--image img',  # Woolworths specific
+            '.product-card__img',  # Woolworths specific
+            '.lazyload-wrapper img',  # Woolworths specific
+            'img[src]',
+            'img[data-src]',
+            'img[data-original]',
+            'img[data-lazy-src]',
+            '.product-image img',
+            '.product-card img',
+            '.product-item img',
+            'img'
+        ]
         
-        print(f"\nScraping {max_pages} page(s) from {self.category_name}\n")
+        for selector in img_selectors:
+            img_elem = product_element.select_one(selector)
+            if img_elem:
+                # Try multiple attributes for image source
+                img_src = (img_elem.get('src') or 
+                          img_elem.get('data-src') or 
+                          img_elem.get('data-original') or
+                          img_elem.get('data-lazy-src'))
+                
+                if img_src and not img_src.startswith('data:'):
+                    # Clean up the URL - handle HTML entities
+                    img_src = img_src.replace('&amp;', '&')
+                    
+                    # Clean up the URL
+                    if img_src.startswith('//'):
+                        img_src = 'https:' + img_src
+                    elif not img_src.startswith('http'):
+                        img_src = f"{self.base_url}{img_src}"
+                    
+                    img_url = img_src
+                    break
         
-        for page_num in range(max_pages):
-            # Calculate page offset (Woolworths uses No parameter)
-            # Pattern: No=(page-1)*24, Nrpp=24 (24 products per page)
-            page_offset = page_num * 24  # 24 products per page
-            
-            if page_num == 0:
-                page_url = self.base_category_url
-            else:
-                page_url = self.paginated_category_url.format(page=page_offset)
-            
-            print(f"\n--- Page {page_num + 1} of {max_pages} ---")
-            soup = self.fetch_page(page_url)
-            
-            if not soup:
-                print(f"❌ Failed to fetch page {page_num + 1}")
-                continue
-            
-            # Find product containers - Woolworths uses various selectors
-            product_containers = []
-            
-            # Try different selectors for product containers
-            selectors = [
-                'article.product-card',  # Woolworths specific - main product cards
-                'div.product-list__item',  # Woolworths specific
-                'div[data-cnstrc-item-id]',  # Woolworths specific
-                'div[data-testid*="product"]',
-                'div.product-item',
-                'div.product-tile', 
-                'div[class*="product"]',
-                'article[class*="product"]',
-                'div[class*="item"]',
-                'div[class*="tile"]',
-                'div[class*="card"]',
-                'div[class*="grid"] > div',
-                'div[class*="list"] > div'
+        # If no image found in elements, try to extract from script tags
+        if not img_url:
+            # Get product ID for matching
+            if not product_id:
+                product_id = ContainerText(product_element).product_id
+            
+            if product_id:
+                # Look for image URLs in script tags that match this product
+                for script in product_element.find_all('script'):
+                    if script.string:
+                        # Look for woolworthsstatic.co.za URLs in script content
+                        matches = ASSET_URL_RE.findall(script.string)
+                        for match in matches:
+                            if product_id in match:
+                                img_url = match
+                                break
+                        if img_url:
+                            break
+                
+                # If still no image, look the product up in the page's script index
+                if not img_url:
+                    img_url = self.lookup_script_image(product_element, product_id)
+        
+        return img_url
+    
+    def page_image_index(self, product_element) -> Dict:
+        """Script image index for the page holding product_element
+        
+        Built with one pass over the page's scripts the first time a product
+        on that page needs it, then shared by every other product on the page.
+        """
+        root = product_element
+        while root.parent is not None:
+            root = root.parent
+        
+        if self.image_index_root is not root:
+            urls = []
+            tokens = {}
+            for script in root.find_all('script'):
+                if script.string:
+                    for url in ASSET_URL_RE.findall(script.string):
+                        urls.append(url)
+                        for token in URL_TOKEN_RE.findall(url):
+                            # The first URL mentioning an id wins, as in document order
+                            tokens.setdefault(token, url)
+            self.image_index = {'urls': urls, 'tokens': tokens}
+            self.image_index_root = root
+        
+        return self.image_index
+    
+    def lookup_script_image(self, product_element, product_id: str) -> str:
+        """Image URL from the page's scripts that mentions product_id"""
+        tokens = self.page_image_index(product_element)['tokens']
+        if product_id not in tokens:
+            # Ids that are only part of a URL token need one substring scan; its result
+            # (a miss too) is recorded so the id is never scanned for again on this page
+            tokens[product_id] = next((url for url in self.image_index['urls'] if product_id in url), None)
+        return tokens[product_id]
+    
+    def extract_price(self, product_element, text: str, product: dict):
+        """Fill product['price'] from data attributes, price elements or the element text"""
+        # Try to get price from data attributes first (Woolworths specific)
+        price_attr = product_element.get('data-cnstrc-item-price')
+        if price_attr:
+            product['price'] = self.parse_price(price_attr)
+        
+        # Try to find price in specific Woolworths elements
+        if not product['price']:
+            price_selectors = [
+                '.product__price .price',  # Woolworths specific
+                '.product-card__actions .price',  # Woolworths specific
+                '.font-graphic .price',  # Woolworths specific
+                '.product-price-combined .price',  # Woolworths specific
+                '.price',  # Generic price class
+                '.product-price',  # Generic product price
             ]
             
-            for selector in selectors:
-                containers = soup.select(selector)
-                if containers and len(containers) > 5:  # Reasonable number of products
-                    product_containers = containers
-                    print(f"Found {len(containers)} product containers using selector: {selector}")
-                    break
+            for selector in price_selectors:
+                price_elem = product_element.select_one(selector)
+                if price_elem:
+                    price_text = price_elem.get_text().strip()
+                    price = self.parse_price(price_text)
+                    if price and price > 0:
+                        product['price'] = price
+                        break
+        
+        # If no price from specific elements, look in text
+        if not product['price']:
+            product['price'] = cents_to_rand(parse_cents(text))
+    
+    def extract_products(self, page, page_url: str = None, max_products: int = None,
+                         fields: tuple = None) -> list:
+        """Extract the products on one listing page
+        
+        Args:
+            page: Page HTML or an already parsed BeautifulSoup (decomposed once extraction is done)
+            page_url: URL the page was fetched from (selects the learned container selector)
+            max_products: Stop extracting once this many products are found (optional)
+            fields: Only extract these product fields (optional, default: all)
+        
+        Unchanged products are only reused when page is HTML, since reuse needs the raw markup.
+        """
+        source = None
+        if isinstance(page, BeautifulSoup):
+            soup = page
+        else:
+            if isinstance(page, bytes):
+                # Decode once here so the markup and the parse tree share source positions
+                page = UnicodeDammit(page, is_html=True).unicode_markup
+            soup = BeautifulSoup(page, 'html.parser')
+            source = PageSource(page)
+        self.scraped_at = datetime.now().isoformat()
+        
+        # Find product containers - the selector that matched this template
+        # last time is tried first; more than 5 matches counts as a product list
+        product_containers, selector = self.selector_cache.find_containers(
+            soup, 'woolworths', page_template(page_url), self.CONTAINER_SELECTORS, min_count=6
+        )
+        if product_containers:
+            print(f"Found {len(product_containers)} product containers using selector: {selector}")
+        
+        if not product_containers:
+            print("⚠️  No product containers found, trying alternative approach...")
+            # Try to find any elements that might contain products
+            product_containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|tile|card'))
+            print(f"Found {len(product_containers)} potential product elements")
+        
+        # Filter out containers that are too small or don't have meaningful content.
+        # The text computed here is reused by extract_product_data.
+        product_containers = [ContainerText(container) for container in product_containers]
+        if product_containers:
+            filtered_containers = [container for container in product_containers if container.looks_like_product()]
+            
+            if filtered_containers:
+                product_containers = filtered_containers
+                print(f"Filtered to {len(product_containers)} meaningful product containers")
+        
+        # Extract products
+        page_products = []
+        reused = 0
+        for i, container in enumerate(product_containers):
+            if max_products and len(page_products) >= max_products:
+                break
             
-            if not product_containers:
-                print("⚠️  No product containers found, trying alternative approach...")
-                # Try to find any elements that might contain products
-                product_containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|tile|card'))
-                print(f"Found {len(product_containers)} potential product elements")
+            if self.context.should_stop():
+                print(f"⏱️  Time budget used up after {len(page_products)} products on this page")
+                break
             
-            # Filter out containers that are too small or don't have meaningful content
-            if product_containers:
-                filtered_containers = []
-                for container in product_containers:
-                    text = container.get_text().strip()
-                    # Skip containers that are too small or don't have product-like content
-                    if len(text) > 10 and ('R' in text or any(word in text.lower() for word in ['kg', 'g', 'ml', 'l', 'pack', 'pk'])):
-                        filtered_containers.append(container)
+            # Without an <img> the image comes from page-level scripts outside the hashed container markup
+            script_image = ''
+            if source and wants(fields, 'image_url') and container.product_id and not container.has_image:
+                script_image = self.lookup_script_image(container.element, container.product_id) or ''
+            product, from_cache = self.fragments.extract(
+                source, container.element, fields, WoolworthsProduct, self.scraped_at,
+                lambda: self.extract_product_data(container, fields), extra=script_image
+            )
+            reused += from_cache
+            
+            # Only add if we have a name
+            if product['name']:
+                page_products.append(product)
+            
+            if (i + 1) % 10 == 0:
+                print(f"  Processed {i + 1}/{len(product_containers)} products...")
+        
+        if reused:
+            print(f"♻️  Reused {reused}/{len(page_products)} unchanged products")
+        
+        # Products only hold plain strings, so the page tree can be freed now
+        self.image_index = None
+        self.image_index_root = None
+        soup.decompose()
+        return page_products
+    
+    def iter_pages(self, max_pages: int = 1, max_products: int = None, fields: tuple = None,
+                   start_page: int = 0, context: ScrapeContext = None):
+        """Yield each page's products as soon as the page is extracted
+        
+        Takes the same arguments as scrape_category. Only one page's parse
+        tree and products are held at a time, and self.products is not set.
+        """
+        if context:
+            self.context = context
+        
+        found = 0
+        
+        try:
+            for page_num in range(start_page, start_page + max_pages):
+                if self.context.should_stop():
+                    print("⏱️  Time budget used up, returning products gathered so far")
+                    break
                 
-                if filtered_containers:
-                    product_containers = filtered_containers
-                    print(f"Filtered to {len(product_containers)} meaningful product containers")
-            
-            # Extract products
-            page_products = []
-            for i, container in enumerate(product_containers):
-                if max_products and len(all_products) >= max_products:
+                # Calculate page offset (Woolworths uses No parameter)
+                # Pattern: No=(page-1)*24, Nrpp=24 (24 products per page)
+                page_offset = page_num * WOOLWORTHS_PAGE_SIZE
+                
+                if page_num == 0:
+                    page_url = self.base_category_url
+                else:
+                    page_url = self.paginated_category_url.format(page=page_offset)
+                
+                if not memory_guard.wait(self.context):
+                    print("⏱️  Time budget used up waiting for memory, returning products gathered so far")
                     break
                 
-                product = self.extract_product_data(container)
+                print(f"\n--- Page {page_num + 1} of {start_page + max_pages} ---")
+                html = self.fetch_html(page_url)
                 
-                # Only add if we have a name
-                if product['name']:
-                    page_products.append(product)
-                    all_products.append(product)
+                if not html:
+                    print(f"❌ Failed to fetch page {page_num + 1}")
+                    continue
                 
-                if (i + 1) % 10 == 0:
-                    print(f"  Processed {i + 1}/{len(product_containers)} products...")
-            
-            print(f"✓ Extracted {len(page_products)} products from page {page_num + 1}")
-            print(f"Total products so far: {len(all_products)}")
-            
-            # Check if we should stop early
-            if max_products and len(all_products) >= max_products:
-                all_products = all_products[:max_products]
-                print(f"\n✓ Reached max_products limit ({max_products})")
-                break
-            
-            # Be respectful - add delay between pages
-            if page_num < max_pages - 1:
-                print("  (Waiting 2 seconds before next page...)")
-                time.sleep(2)
+                remaining = max_products - found if max_products else None
+                page_products = self.extract_products(html, page_url, max_products=remaining, fields=fields)
+                found += len(page_products)
+                
+                print(f"✓ Extracted {len(page_products)} products from page {page_num + 1}")
+                print(f"Total products so far: {found}")
+                
+                yield page_products
+                
+                # Check if we should stop early
+                if max_products and found >= max_products:
+                    print(f"\n✓ Reached max_products limit ({max_products})")
+                    break
+                
+                # Be respectful - add delay between pages
+                if page_num < start_page + max_pages - 1:
+                    print("  (Waiting 2 seconds before next page...)")
+                    self.context.pause(2)
+        finally:
+            # One write per scrape rather than per page
+            self.fragments.save()
+    
+    def iter_products(self, max_pages: int = 1, max_products: int = None, fields: tuple = None,
+                      start_page: int = 0, context: ScrapeContext = None):
+        """Yield products one at a time across pages (see iter_pages)"""
+        for page_products in self.iter_pages(max_pages, max_products, fields, start_page, context):
+            yield from page_products
+    
+    def scrape_category(self, max_pages: int = 1, max_products: int = None, fields: tuple = None,
+                        start_page: int = 0, context: ScrapeContext = None) -> list:
+        """Scrape products from the category with pagination
+        
+        Args:
+            max_pages: Number of pages to scrape
+            max_products: Stop after N products (optional)
+            fields: Only extract these product fields (optional, default: all)
+            start_page: First page to scrape (0-indexed, default: 0)
+            context: Time budget for the whole scrape (optional, sets context.partial when cut short)
+        """
+        print("=" * 80)
+        print("Woolworths Scraper")
+        print("=" * 80)
+        print(f"Category: {self.category_name}")
+        print("=" * 80)
+        
+        print(f"\nScraping {max_pages} page(s) from {self.category_name}\n")
+        
+        all_products = list(self.iter_products(max_pages, max_products, fields, start_page, context))
         
         print(f"\n{'=' * 80}")
         print(f"✓ Total products extracted: {len(all_products)}")
@@ -514,7 +583,7 @@ class WoolworthsScraper:
             filename = f'woolworths_{self.category}_products.json'
         
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.products, f, indent=2, ensure_ascii=False)
+            json.dump(self.products, f, indent=2, ensure_ascii=False, default=json_default)
         print(f"✓ Saved to {filename}")
     
     def save_csv(self, filename: str = None):